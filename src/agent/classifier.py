@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import json
+import hashlib
 import logging
 import re
+import time
+from collections import OrderedDict
 
 from agno.models.message import Message
 from agno.models.response import ModelResponse
@@ -35,31 +37,69 @@ Respond ONLY with the JSON object, no extra text. Work in any language.\
 
 _SAFE_DEFAULT = CommentClassification(sentiment="neutral", is_pattern_correction=False)
 
+# The JSON object inside an optional ```json fence
+_JSON_OBJECT_RE = re.compile(r"(?:```(?:json)?\s*)?(\{.*\})(?:\s*```)?", re.S)
+
+
+# GitHub re-delivers webhooks, so the same comment body can show up more
+# than once; remember recent results to skip the repeated LLM call.
+_CACHE_TTL = 3600.0  # seconds
+_CACHE_MAX_ENTRIES = 2048
+
+_classification_cache: OrderedDict[bytes, tuple[CommentClassification, float]] = OrderedDict()
+
+
+def reset_classification_cache() -> None:
+    _classification_cache.clear()
+
+
+def _cache_key(body: str) -> bytes:
+    return hashlib.blake2b(body.encode(), digest_size=16).digest()
+
 
 async def classify_comment(body: str) -> CommentClassification:
+    key = _cache_key(body)
+    cached = _classification_cache.get(key)
+    if cached:
+        if cached[1] > time.monotonic():
+            _classification_cache.move_to_end(key)
+            return cached[0]
+        del _classification_cache[key]
+
     try:
-        model = build_classifier_model()
-        messages = [
-            Message(role="system", content=_CLASSIFIER_SYSTEM_PROMPT),
-            Message(role="user", content=body),
-        ]
-        response: ModelResponse = await model.aresponse(
-            messages=messages,
-            response_format=CommentClassification,
-        )
-
-        if response.parsed is not None:
-            return response.parsed  # type: ignore[no-any-return]
-
-        raw = response.content or ""
-        if isinstance(raw, list):
-            raw = "".join(str(part) for part in raw)
-
-        # Strip markdown code fences if present
-        raw = re.sub(r"^```(?:json)?\s*", "", raw.strip())
-        raw = re.sub(r"\s*```$", "", raw.strip())
-
-        return CommentClassification.model_validate(json.loads(raw))
+        classification = await _classify(body)
     except Exception:
         logger.warning("Comment classification failed, using safe defaults", exc_info=True)
         return _SAFE_DEFAULT
+
+    _classification_cache[key] = (classification, time.monotonic() + _CACHE_TTL)
+    _classification_cache.move_to_end(key)
+    if len(_classification_cache) > _CACHE_MAX_ENTRIES:
+        _classification_cache.popitem(last=False)
+    return classification
+
+
+async def _classify(body: str) -> CommentClassification:
+    model = build_classifier_model()
+    messages = [
+        Message(role="system", content=_CLASSIFIER_SYSTEM_PROMPT),
+        Message(role="user", content=body),
+    ]
+    response: ModelResponse = await model.aresponse(
+        messages=messages,
+        response_format=CommentClassification,
+    )
+
+    if response.parsed is not None:
+        return response.parsed  # type: ignore[no-any-return]
+
+    raw = response.content or ""
+    if isinstance(raw, list):
+        raw = "".join(str(part) for part in raw)
+
+    raw = raw.strip()
+    # Plain JSON is the common case; only unwrap markdown fences otherwise
+    if not raw.startswith("{") and (match := _JSON_OBJECT_RE.search(raw)):
+        raw = match.group(1)
+
+    return CommentClassification.model_validate_json(raw)
@@ -7,12 +7,11 @@ from pydantic import BaseModel
 
 from src.api.auth import verify_api_key
 from src.db.queries import (
-    count_usage_events_for_period,
     get_active_users_for_period,
     get_billing_history,
     get_billing_period_by_id,
     get_billing_summary,
-    get_usage_events_for_period,
+    get_usage_events_page,
 )
 
 router = APIRouter(prefix="/billing", tags=["billing"], dependencies=[Depends(verify_api_key)])
@@ -142,8 +141,7 @@ async def usage_events(
         if not period or period.org != org:
             raise HTTPException(status_code=404, detail="Billing period not found for this org")
 
-    events = await get_usage_events_for_period(period_id, limit=limit, offset=offset)
-    total = await count_usage_events_for_period(period_id)
+    events, total = await get_usage_events_page(period_id, limit=limit, offset=offset)
     return UsageEventsOut(
         events=[
             UsageEventOut(
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Sequence
 from contextlib import asynccontextmanager
 from datetime import UTC, datetime, timedelta
+from typing import Any
 
 from sqlalchemy import delete as sa_delete
 from sqlalchemy import func as sa_func
-from sqlalchemy import select, update
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config import Language
 from src.db.engine import db_session
 from src.db.tables import (
+    Base,
     BillingActiveUserRecord,
     BillingPeriodRecord,
     BillingUsageEventRecord,
@@ -26,6 +29,15 @@ from src.db.tables import (
 from src.models import RepoStatus, Sentiment
 
 
+def _scalar_defaults(model: type[Base]) -> dict[str, Any]:
+    """Return the Python-side scalar column defaults of *model*.
+
+    SQLAlchemy does not reliably apply these to INSERTs nested in CTEs, so
+    statements built that way must pass them explicitly.
+    """
+    return {c.key: c.default.arg for c in model.__table__.columns if c.default is not None and c.default.is_scalar}
+
+
 @asynccontextmanager
 async def _use_session(session: AsyncSession | None) -> AsyncIterator[tuple[AsyncSession, bool]]:
     """Yield ``(session, is_owner)``.
@@ -69,6 +81,41 @@ async def upsert_repository(
         return repo
 
 
+async def upsert_repositories(
+    rows: Sequence[tuple[str, int, str | None]],
+    *,
+    session: AsyncSession | None = None,
+) -> None:
+    """Insert or update ``(full_name, installation_id, default_branch)`` rows in one statement.
+
+    A ``None`` branch falls back to ``"main"``.  When a name repeats, its last row wins.
+    """
+    if not rows:
+        return
+    # ON CONFLICT can't touch the same row twice within one statement
+    latest = {full_name: (installation_id, default_branch) for full_name, installation_id, default_branch in rows}
+    stmt = pg_insert(RepositoryRecord).values(
+        [
+            {
+                "full_name": full_name,
+                "installation_id": installation_id,
+                "default_branch": default_branch or "main",
+            }
+            for full_name, (installation_id, default_branch) in latest.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RepositoryRecord.full_name],
+        set_={
+            "installation_id": stmt.excluded.installation_id,
+            "default_branch": stmt.excluded.default_branch,
+            "updated_at": sa_func.now(),
+        },
+    )
+    async with _use_session(session) as (s, _):
+        await s.execute(stmt)
+
+
 async def get_repository(
     full_name: str,
     *,
@@ -183,18 +230,19 @@ async def save_feedback(
     *,
     session: AsyncSession | None = None,
 ) -> FeedbackRecord:
-    record = FeedbackRecord(
-        repo_full_name=repo_full_name,
-        original_comment=original_comment,
-        user_response=user_response,
-        sentiment=sentiment,
+    # INSERT ... RETURNING hands back id and created_at in the same round-trip
+    stmt = (
+        insert(FeedbackRecord)
+        .values(
+            repo_full_name=repo_full_name,
+            original_comment=original_comment,
+            user_response=user_response,
+            sentiment=sentiment,
+        )
+        .returning(FeedbackRecord)
     )
-    async with _use_session(session) as (s, is_owner):
-        s.add(record)
-        await s.flush()
-        if is_owner:
-            await s.refresh(record)
-        return record
+    async with _use_session(session) as (s, _):
+        return (await s.scalars(stmt)).one()
 
 
 # --- Org settings helpers ---
@@ -236,6 +284,49 @@ async def set_org_language(
 # --- Billing helpers ---
 
 
+# month -> (following month, years to carry)
+_NEXT_MONTH = {month: (month % 12 + 1, month // 12) for month in range(1, 13)}
+
+
+def _billing_period_bounds(ref_date: datetime) -> tuple[datetime, datetime]:
+    """Return ``(period_start, period_end)`` of the calendar month containing *ref_date*."""
+    period_start = ref_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    next_month, carry = _NEXT_MONTH[period_start.month]
+    period_end = period_start.replace(year=period_start.year + carry, month=next_month)
+    return period_start, period_end
+
+
+# Billing periods are never deleted, so once a period row is known to be
+# committed its id can be reused by the per-event writers without a lookup.
+# org -> (period_start, id) of the current month only; a new month replaces
+# the entry, and the oldest org is dropped once the cap is reached.
+_BILLING_PERIOD_CACHE_SIZE = 1024
+_billing_period_ids: dict[str, tuple[datetime, int]] = {}
+
+
+def reset_billing_period_cache() -> None:
+    _billing_period_ids.clear()
+
+
+async def _current_billing_period_id(org: str, session: AsyncSession, is_owner: bool) -> int:
+    period_start, _ = _billing_period_bounds(datetime.now(UTC))
+    cached = _billing_period_ids.get(org)
+    if cached is not None and cached[0] == period_start:
+        return cached[1]
+    if not is_owner:
+        # The caller's transaction may still roll back, so don't cache its rows
+        period = await get_or_create_billing_period(org, session=session)
+        return period.id
+
+    # Resolve the period in its own session; once that has committed the id is safe to cache
+    period = await get_or_create_billing_period(org)
+    _billing_period_ids.pop(org, None)
+    if len(_billing_period_ids) >= _BILLING_PERIOD_CACHE_SIZE:
+        del _billing_period_ids[next(iter(_billing_period_ids))]
+    _billing_period_ids[org] = (period_start, period.id)
+    return period.id
+
+
 async def get_or_create_billing_period(
     org: str,
     ref_date: datetime | None = None,
@@ -244,11 +335,7 @@ async def get_or_create_billing_period(
 ) -> BillingPeriodRecord:
     if ref_date is None:
         ref_date = datetime.now(UTC)
-    period_start = ref_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    if period_start.month == 12:
-        period_end = period_start.replace(year=period_start.year + 1, month=1)
-    else:
-        period_end = period_start.replace(month=period_start.month + 1)
+    period_start, period_end = _billing_period_bounds(ref_date)
 
     async with _use_session(session) as (s, is_owner):
         result = await s.execute(
@@ -258,27 +345,25 @@ async def get_or_create_billing_period(
             )
         )
         period = result.scalar_one_or_none()
-        if period:
-            return period
-
-        period = BillingPeriodRecord(org=org, period_start=period_start, period_end=period_end)
-        s.add(period)
-        try:
-            if is_owner:
-                await s.commit()
-                await s.refresh(period)
-            else:
-                await s.flush()
-            return period
-        except IntegrityError:
-            await s.rollback()
-            result = await s.execute(
-                select(BillingPeriodRecord).where(
-                    BillingPeriodRecord.org == org,
-                    BillingPeriodRecord.period_start == period_start,
+        if period is None:
+            period = BillingPeriodRecord(org=org, period_start=period_start, period_end=period_end)
+            s.add(period)
+            try:
+                if is_owner:
+                    await s.commit()
+                    await s.refresh(period)
+                else:
+                    await s.flush()
+            except IntegrityError:
+                await s.rollback()
+                result = await s.execute(
+                    select(BillingPeriodRecord).where(
+                        BillingPeriodRecord.org == org,
+                        BillingPeriodRecord.period_start == period_start,
+                    )
                 )
-            )
-            return result.scalar_one()
+                period = result.scalar_one()
+        return period
 
 
 async def track_active_user(
@@ -288,17 +373,17 @@ async def track_active_user(
     session: AsyncSession | None = None,
 ) -> bool:
     async with _use_session(session) as (s, is_owner):
-        period = await get_or_create_billing_period(org, session=s)
+        period_id = await _current_billing_period_id(org, s, is_owner)
         result = await s.execute(
             select(BillingActiveUserRecord).where(
-                BillingActiveUserRecord.billing_period_id == period.id,
+                BillingActiveUserRecord.billing_period_id == period_id,
                 BillingActiveUserRecord.github_username == github_username,
             )
         )
         if result.scalar_one_or_none():
             return False
 
-        user_record = BillingActiveUserRecord(billing_period_id=period.id, org=org, github_username=github_username)
+        user_record = BillingActiveUserRecord(billing_period_id=period_id, org=org, github_username=github_username)
         s.add(user_record)
         try:
             await s.flush()
@@ -311,7 +396,7 @@ async def track_active_user(
         new_cap = new_count * BillingPeriodRecord.soft_cap_reviews_per_seat
         await s.execute(
             update(BillingPeriodRecord)
-            .where(BillingPeriodRecord.id == period.id)
+            .where(BillingPeriodRecord.id == period_id)
             .values(
                 active_user_count=new_count,
                 over_soft_cap=BillingPeriodRecord.review_count > new_cap,
@@ -331,9 +416,9 @@ async def record_usage_event(
     session: AsyncSession | None = None,
 ) -> BillingUsageEventRecord:
     async with _use_session(session) as (s, is_owner):
-        period = await get_or_create_billing_period(org, session=s)
+        period_id = await _current_billing_period_id(org, s, is_owner)
         event = BillingUsageEventRecord(
-            billing_period_id=period.id,
+            billing_period_id=period_id,
             org=org,
             repo_full_name=repo_full_name,
             pr_number=pr_number,
@@ -346,7 +431,7 @@ async def record_usage_event(
         total_cap = BillingPeriodRecord.active_user_count * BillingPeriodRecord.soft_cap_reviews_per_seat
         await s.execute(
             update(BillingPeriodRecord)
-            .where(BillingPeriodRecord.id == period.id)
+            .where(BillingPeriodRecord.id == period_id)
             .values(
                 review_count=new_count,
                 over_soft_cap=new_count > total_cap,
@@ -357,6 +442,114 @@ async def record_usage_event(
         return event
 
 
+async def record_usage_events_bulk(
+    org: str,
+    events: Sequence[tuple[str, int, str]],
+    *,
+    session: AsyncSession | None = None,
+) -> None:
+    """Record several ``(repo_full_name, pr_number, pr_author)`` usage events at once.
+
+    Same effect as calling :func:`record_usage_event` per event, but with one
+    batched INSERT and a single ``review_count`` update.
+    """
+    if not events:
+        return
+    async with _use_session(session) as (s, is_owner):
+        period_id = await _current_billing_period_id(org, s, is_owner)
+        await s.execute(
+            insert(BillingUsageEventRecord),
+            [
+                {
+                    "billing_period_id": period_id,
+                    "org": org,
+                    "repo_full_name": repo_full_name,
+                    "pr_number": pr_number,
+                    "pr_author": pr_author,
+                }
+                for repo_full_name, pr_number, pr_author in events
+            ],
+        )
+        new_count = BillingPeriodRecord.review_count + len(events)
+        total_cap = BillingPeriodRecord.active_user_count * BillingPeriodRecord.soft_cap_reviews_per_seat
+        await s.execute(
+            update(BillingPeriodRecord)
+            .where(BillingPeriodRecord.id == period_id)
+            .values(
+                review_count=new_count,
+                over_soft_cap=new_count > total_cap,
+            )
+        )
+
+
+async def save_review_with_usage(
+    org: str,
+    repo_full_name: str,
+    pr_number: int,
+    body: str,
+    comment_count: int,
+    pr_author: str,
+    *,
+    session: AsyncSession | None = None,
+) -> None:
+    """Persist a posted review together with its billing usage event.
+
+    Everything runs as one statement, so it costs a single round-trip: the
+    billing period is upserted (creating it or bumping ``review_count``) in a
+    CTE, the usage event INSERT reads the period id from it, and the review
+    INSERT is the outer statement.
+    """
+    period_start, period_end = _billing_period_bounds(datetime.now(UTC))
+    new_count = BillingPeriodRecord.review_count + 1
+    total_cap = BillingPeriodRecord.active_user_count * BillingPeriodRecord.soft_cap_reviews_per_seat
+    period_cte = (
+        pg_insert(BillingPeriodRecord)
+        .values(
+            {
+                **_scalar_defaults(BillingPeriodRecord),
+                "org": org,
+                "period_start": period_start,
+                "period_end": period_end,
+                "review_count": 1,
+                # A fresh period has no active users yet, so its cap is zero
+                "over_soft_cap": True,
+            }
+        )
+        .on_conflict_do_update(
+            index_elements=[BillingPeriodRecord.org, BillingPeriodRecord.period_start],
+            set_={"review_count": new_count, "over_soft_cap": new_count > total_cap},
+        )
+        .returning(BillingPeriodRecord.id)
+        .cte("billing_period")
+    )
+    event_cte = (
+        insert(BillingUsageEventRecord)
+        .values(
+            {
+                **_scalar_defaults(BillingUsageEventRecord),
+                "billing_period_id": select(period_cte.c.id).scalar_subquery(),
+                "org": org,
+                "repo_full_name": repo_full_name,
+                "pr_number": pr_number,
+                "pr_author": pr_author,
+            }
+        )
+        .cte("new_usage_event")
+    )
+    async with _use_session(session) as (s, _):
+        await s.execute(
+            insert(ReviewRecord)
+            .values(
+                repo_full_name=repo_full_name,
+                pr_number=pr_number,
+                body=body,
+                comment_count=comment_count,
+            )
+            .add_cte(period_cte)
+            .add_cte(event_cte)
+        )
+
+
 async def get_billing_period_by_id(
     period_id: int,
     *,
@@ -430,6 +623,20 @@ async def get_usage_events_for_period(
         return list(result.scalars().all())
 
 
+async def get_usage_events_page(
+    billing_period_id: int,
+    limit: int = 50,
+    offset: int = 0,
+    *,
+    session: AsyncSession | None = None,
+) -> tuple[list[BillingUsageEventRecord], int]:
+    """Return one page of a period's usage events plus the period's total event count."""
+    async with _use_session(session) as (s, _):
+        events = await get_usage_events_for_period(billing_period_id, limit=limit, offset=offset, session=s)
+        total = await count_usage_events_for_period(billing_period_id, session=s)
+        return events, total
+
+
 async def count_usage_events_for_period(
     billing_period_id: int,
     *,
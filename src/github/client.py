@@ -8,6 +8,7 @@ Retries are handled transparently for server errors (5xx) and rate limits (429).
 from __future__ import annotations
 
 import asyncio
+import codecs
 import logging
 
 import httpx
@@ -19,8 +20,10 @@ logger = logging.getLogger(__name__)
 
 _MAX_RETRIES = 3
 _TIMEOUT = 30.0
+_CONNECT_RETRIES = 2
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
 
-# ── Shared HTTP client (connection pooling) ──────────────────────
+# ── Shared HTTP client (connection pooling, HTTP/2) ──────────────
 
 _client: httpx.AsyncClient | None = None
 
@@ -28,7 +31,10 @@ _client: httpx.AsyncClient | None = None
 def _get_client() -> httpx.AsyncClient:
     global _client
     if _client is None:
-        _client = httpx.AsyncClient(base_url=GITHUB_API, timeout=_TIMEOUT)
+        # HTTP/2 lets concurrent requests (e.g. onboarding file fetches) share
+        # one connection instead of opening a TLS session each.
+        transport = httpx.AsyncHTTPTransport(http2=True, limits=_LIMITS, retries=_CONNECT_RETRIES)
+        _client = httpx.AsyncClient(base_url=GITHUB_API, timeout=_TIMEOUT, transport=transport)
     return _client
 
 
@@ -169,18 +175,37 @@ async def get_diff_files(installation_id: int, repo: str, pr_number: int) -> lis
     ]
 
 
-async def get_file_content(installation_id: int, repo: str, path: str, ref: str) -> str:
+async def get_file_content(
+    installation_id: int,
+    repo: str,
+    path: str,
+    ref: str,
+    max_bytes: int | None = None,
+) -> str:
+    """Fetch raw file content ("" if missing), optionally only the first *max_bytes*.
+
+    The Range header keeps large files off the wire; if it's ignored the body is sliced here.
+    """
+    headers = {"Accept": "application/vnd.github.raw+json"}
+    if max_bytes is not None:
+        headers["Range"] = f"bytes=0-{max_bytes - 1}"
     resp = await _request(
         installation_id,
         "GET",
         f"/repos/{repo}/contents/{path}",
         params={"ref": ref},
-        headers={"Accept": "application/vnd.github.raw+json"},
+        headers=headers,
     )
-    if resp.status_code == 404:
+    # 416: an empty file can't satisfy any byte range
+    if resp.status_code in (404, 416):
         return ""
     resp.raise_for_status()
-    return resp.text
+    if max_bytes is None:
+        return resp.text
+    # The cut may land inside a multi-byte character: a non-final incremental decode
+    # holds back only that partial tail, and replaces bad bytes elsewhere like resp.text
+    decoder = codecs.getincrementaldecoder(resp.encoding or "utf-8")(errors="replace")
+    return decoder.decode(resp.content[:max_bytes])
 
 
 async def get_repo_tree(installation_id: int, repo: str, ref: str = "HEAD") -> list[str]:
@@ -19,7 +19,7 @@ from src.db.queries import (
     is_delivery_processed,
     mark_delivery_processed,
     track_active_user,
-    upsert_repository,
+    upsert_repositories,
 )
 from src.github.mappers import map_comment_event, map_installation_event, map_pr_event
 from src.models import extract_org
@@ -153,8 +153,8 @@ async def _handle_installation(payload: dict) -> None:
     action = payload.get("action")
     if action in ("created", "added"):
         repos = map_installation_event(payload)
+        await upsert_repositories([(r.full_name, r.installation_id, r.default_branch) for r in repos])
         for repo in repos:
-            await upsert_repository(repo.full_name, repo.installation_id, repo.default_branch)
             logger.info("Registered repository %s (pending activation)", repo.full_name)
     elif action == "deleted":
         # App uninstalled — clean up all repos for this installation
@@ -5,12 +5,23 @@ import uuid
 
 from agno.knowledge import Knowledge
 from agno.vectordb.pgvector import PgVector, SearchType
+from sqlalchemy import Engine, create_engine
 
 from src.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 _knowledge_bases: dict[str, Knowledge] = {}
+# One (sync) engine for every per-repo vector store, so they share a pool
+# instead of each PgVector opening its own.
+_vector_engine: Engine | None = None
+
+
+def _get_vector_engine() -> Engine:
+    global _vector_engine
+    if _vector_engine is None:
+        _vector_engine = create_engine(get_settings().pgvector_url)
+    return _vector_engine
 
 
 def _table_name(repo_full_name: str) -> str:
@@ -23,10 +34,9 @@ def get_knowledge_base(repo_full_name: str) -> Knowledge:
     if repo_full_name in _knowledge_bases:
         return _knowledge_bases[repo_full_name]
 
-    s = get_settings()
     vector_db = PgVector(
         table_name=_table_name(repo_full_name),
-        db_url=s.pgvector_url,
+        db_engine=_get_vector_engine(),
         search_type=SearchType.hybrid,
     )
     kb = Knowledge(vector_db=vector_db)
@@ -70,7 +80,11 @@ async def drop_knowledge_base(repo_full_name: str) -> None:
 
 
 def reset_knowledge_bases() -> None:
+    global _vector_engine
     _knowledge_bases.clear()
+    if _vector_engine is not None:
+        _vector_engine.dispose()
+        _vector_engine = None
 
 
 async def store_feedback(repo_full_name: str, original: str, response: str, sentiment: str) -> None:
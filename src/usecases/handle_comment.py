@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
 import httpx
@@ -39,22 +40,28 @@ async def handle_comment(event: CommentEvent) -> None:
     if event.path:
         context_parts.append(f"**File:** {event.path}, **Line:** {event.line}")
 
-    # Get thread context if this is a reply
+    # Get thread context if this is a reply, alongside the org language preference
     original_comment_body = ""
+    org = extract_org(repo.full_name)
     if event.in_reply_to_id:
-        comments = await gh.get_review_comments(repo.installation_id, repo.full_name, event.pr_number)
-        original = next((c for c in comments if c["id"] == event.in_reply_to_id), None)
-        if original:
-            original_comment_body = original.get("body", "")
-        thread = [
-            c for c in comments if c["id"] == event.in_reply_to_id or c.get("in_reply_to_id") == event.in_reply_to_id
-        ]
-        if thread:
-            thread_text = "\n".join(f"**{c['user']['login']}:** {c['body']}" for c in thread)
+        org_language, comments = await asyncio.gather(
+            get_org_language(org),
+            gh.get_review_comments(repo.installation_id, repo.full_name, event.pr_number),
+        )
+        # Single pass: pick out the original comment and collect the whole thread
+        target = event.in_reply_to_id
+        thread_lines: list[str] = []
+        for c in comments:
+            is_original = c["id"] == target
+            if is_original:
+                original_comment_body = c.get("body", "")
+            if is_original or c.get("in_reply_to_id") == target:
+                thread_lines.append(f"**{c['user']['login']}:** {c['body']}")
+        if thread_lines:
+            thread_text = "\n".join(thread_lines)
             context_parts.append(f"**Thread context:**\n{thread_text}")
-
-    # Look up org language preference
-    org_language = await get_org_language(extract_org(repo.full_name))
+    else:
+        org_language = await get_org_language(org)
 
     # Create agent and generate reply
     agent = create_comment_agent(repo.full_name, repo.installation_id, language=org_language)
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from collections.abc import Callable
+from itertools import islice
 
 from src.agent.factory import create_evolution_agent, create_onboard_agent
 from src.agent.retry import run_agent_with_retry
@@ -35,6 +37,7 @@ KEY_FILES = [
     "docker-compose.yml",
     "Dockerfile",
 ]
+_KEY_FILE_NAMES = frozenset(KEY_FILES)
 
 # File extensions we want to sample for architecture analysis
 CODE_EXTENSIONS = {
@@ -54,11 +57,51 @@ CODE_EXTENSIONS = {
     ".exs",
 }
 
+# Path fragments that hint at architectural entry points (services, routes, ...)
+_STRUCTURAL_PATTERNS = (
+    "main.",
+    "app.",
+    "server.",
+    "index.",
+    "routes.",
+    "router.",
+    "urls.",
+    "/services/",
+    "/service/",
+    "/usecases/",
+    "/use_cases/",
+    "/controllers/",
+    "/handlers/",
+    "/repositories/",
+    "/repos/",
+    "/middleware/",
+    "/middleware.",
+    "/models/",
+    "/entities/",
+    "/domain/",
+)
+
 # Max files to sample for the agent context
 MAX_SAMPLE_FILES = 15
-MAX_FILE_SIZE = 8000  # chars
+MAX_FILE_SIZE = 8000  # bytes, requested per file
 _MAX_CONCURRENT_FETCHES = 5
 
+# Discovery results (tree, key files, structural samples) from a failed
+# attempt, keyed by (repo, head commit) so a retry of the same commit doesn't
+# repeat those GitHub calls and a push in between starts from a fresh tree.
+_DISCOVERY_TTL = 900.0  # seconds
+
+_discovery_cache: dict[tuple[str, str], tuple[float, list[str], str, str]] = {}
+
+
+def reset_discovery_cache() -> None:
+    _discovery_cache.clear()
+
+
+def _prune_discovery_cache(now: float) -> None:
+    for key in [key for key, entry in _discovery_cache.items() if entry[0] <= now]:
+        del _discovery_cache[key]
+
 
 async def onboard_repo(repo: Repository) -> None:
     # TODO: Consider decomposing into smaller functions (fetch context, run
@@ -67,24 +110,41 @@ async def onboard_repo(repo: Repository) -> None:
 
     await upsert_repository(repo.full_name, repo.installation_id, repo.default_branch)
 
-    try:
-        tree = await gh.get_repo_tree(repo.installation_id, repo.full_name, repo.default_branch)
-    except Exception:
-        logger.exception("Failed to fetch repo tree for %s, aborting onboarding", repo.full_name)
-        await set_repository_status(repo.full_name, RepoStatus.PENDING)
-        raise
+    commits = await _get_recent_commits(repo)
+    head_sha = commits[0]["sha"] if commits else None
+    cache_key = (repo.full_name, head_sha) if head_sha else None
+    # Read the tree and every file at one commit so they can't straddle a push
+    ref = head_sha or repo.default_branch
+
+    _prune_discovery_cache(time.monotonic())
+    cached = _discovery_cache.get(cache_key) if cache_key else None
+    if cached:
+        logger.info("Reusing discovery from a recent onboarding attempt for %s", repo.full_name)
+        _, tree, key_file_contents, structural_samples = cached
+    else:
+        try:
+            tree = await gh.get_repo_tree(repo.installation_id, repo.full_name, ref)
+
+            # Key config files and a few "structural" code files (entry points, services, etc.)
+            key_file_contents, structural_samples = await asyncio.gather(
+                _fetch_key_files(repo, tree, ref),
+                _fetch_structural_samples(repo, tree, ref),
+            )
+        except Exception:
+            logger.exception("Failed to discover repo structure for %s, aborting onboarding", repo.full_name)
+            await set_repository_status(repo.full_name, RepoStatus.PENDING)
+            raise
+        if cache_key:
+            now = time.monotonic()
+            _prune_discovery_cache(now)
+            _discovery_cache[cache_key] = (now + _DISCOVERY_TTL, tree, key_file_contents, structural_samples)
+
     try:
         tree_summary = "\n".join(tree[:500])
 
-        # Fetch key config files
-        key_file_contents = await _fetch_key_files(repo, tree)
-
         # Fetch recently changed files to understand current patterns
-        recent_files = await _get_recently_changed_files(repo)
-        recent_code_samples = await _fetch_code_samples(repo, recent_files)
-
-        # Fetch a few "structural" code files (entry points, services, etc.)
-        structural_samples = await _fetch_structural_samples(repo, tree)
+        recent_files = await _get_recently_changed_files(repo, commits)
+        recent_code_samples = await _fetch_code_samples(repo, recent_files, ref)
 
         # Run the onboard agent for overall architecture understanding
         onboard_agent = create_onboard_agent(repo.full_name, repo.installation_id, repo.default_branch)
@@ -122,6 +182,8 @@ async def onboard_repo(repo: Repository) -> None:
         await set_repository_status(repo.full_name, RepoStatus.PENDING)
         raise
 
+    if cache_key:
+        _discovery_cache.pop(cache_key, None)
     await set_repository_status(repo.full_name, RepoStatus.ACTIVE)
     logger.info("Onboarding complete for %s — status set to active", repo.full_name)
 
@@ -129,15 +191,22 @@ async def onboard_repo(repo: Repository) -> None:
 async def _fetch_files_concurrently(
     repo: Repository,
     paths: list[str],
+    ref: str,
     formatter: Callable[[str, str], str],
 ) -> str:
-    """Fetch file contents concurrently and format them using *formatter(path, content)*."""
+    """Fetch file contents at *ref* concurrently and format them using *formatter(path, content)*."""
     sem = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
 
     async def _fetch(path: str) -> str | None:
         async with sem:
             try:
-                content = await gh.get_file_content(repo.installation_id, repo.full_name, path, repo.default_branch)
+                content = await gh.get_file_content(
+                    repo.installation_id,
+                    repo.full_name,
+                    path,
+                    ref,
+                    max_bytes=MAX_FILE_SIZE,
+                )
             except Exception:
                 logger.warning("Failed to fetch %s from %s", path, repo.full_name)
                 return None
@@ -147,25 +216,28 @@ async def _fetch_files_concurrently(
     return "\n\n".join(r for r in results if r)
 
 
-async def _fetch_key_files(repo: Repository, tree: list[str]) -> str:
-    paths = [
-        path for path in tree if (path.rsplit("/", 1)[-1] if "/" in path else path) in KEY_FILES or path in KEY_FILES
-    ]
+async def _fetch_key_files(repo: Repository, tree: list[str], ref: str) -> str:
+    # Stop scanning as soon as we have enough candidates — trees can hold 10k+ paths
+    paths = list(islice((path for path in tree if path.rsplit("/", 1)[-1] in _KEY_FILE_NAMES), MAX_SAMPLE_FILES))
     return await _fetch_files_concurrently(
         repo,
         paths,
-        lambda path, content: f"### {path}\n```\n{content[:MAX_FILE_SIZE]}\n```",
+        ref,
+        lambda path, content: f"### {path}\n```\n{content}\n```",
     )
 
 
-async def _get_recently_changed_files(repo: Repository) -> list[str]:
-    """Get a deduplicated list of files from recent commits."""
+async def _get_recent_commits(repo: Repository) -> list[dict]:
+    """Recent commits on the default branch, newest first; empty if GitHub can't be reached."""
     try:
-        commits = await gh.get_recent_commits(repo.installation_id, repo.full_name, repo.default_branch, count=30)
+        return await gh.get_recent_commits(repo.installation_id, repo.full_name, repo.default_branch, count=30)
     except Exception:
         logger.warning("Could not fetch recent commits for %s", repo.full_name)
         return []
 
+
+async def _get_recently_changed_files(repo: Repository, commits: list[dict]) -> list[str]:
+    """Get a deduplicated list of files from recent commits."""
     sem = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
 
     async def _get_files(sha: str) -> list[str]:
@@ -187,52 +259,25 @@ async def _get_recently_changed_files(repo: Repository) -> list[str]:
     return ordered
 
 
-async def _fetch_code_samples(repo: Repository, file_paths: list[str]) -> str:
+async def _fetch_code_samples(repo: Repository, file_paths: list[str], ref: str) -> str:
     """Fetch content of recently changed code files."""
     return await _fetch_files_concurrently(
         repo,
         file_paths[:MAX_SAMPLE_FILES],
-        lambda path, content: f"### {path} (recently modified)\n```\n{content[:MAX_FILE_SIZE]}\n```",
+        ref,
+        lambda path, content: f"### {path} (recently modified)\n```\n{content}\n```",
     )
 
 
-async def _fetch_structural_samples(repo: Repository, tree: list[str]) -> str:
+async def _fetch_structural_samples(repo: Repository, tree: list[str], ref: str) -> str:
     """Fetch files that are likely architectural entry points."""
-    structural_patterns = [
-        "main.",
-        "app.",
-        "server.",
-        "index.",
-        "routes.",
-        "router.",
-        "urls.",
-        "/services/",
-        "/service/",
-        "/usecases/",
-        "/use_cases/",
-        "/controllers/",
-        "/handlers/",
-        "/repositories/",
-        "/repos/",
-        "/middleware/",
-        "/middleware.",
-        "/models/",
-        "/entities/",
-        "/domain/",
-    ]
-    candidates: list[str] = []
-    for path in tree:
-        lower = path.lower()
-        if not _is_code_file(path):
-            continue
-        if any(p in lower for p in structural_patterns):
-            candidates.append(path)
-
-    selected = candidates[:MAX_SAMPLE_FILES]
+    candidates = (path for path in tree if _is_code_file(path) and _is_structural(path))
+    selected = list(islice(candidates, MAX_SAMPLE_FILES))
     return await _fetch_files_concurrently(
         repo,
         selected,
-        lambda path, content: f"### {path}\n```\n{content[:MAX_FILE_SIZE]}\n```",
+        ref,
+        lambda path, content: f"### {path}\n```\n{content}\n```",
     )
 
 
@@ -246,6 +291,11 @@ async def _get_recent_pr_titles(repo: Repository) -> str:
     return "\n".join(f"- #{pr['number']}: {pr['title']}" for pr in prs)
 
 
+def _is_structural(path: str) -> bool:
+    lower = path.lower()
+    return any(p in lower for p in _STRUCTURAL_PATTERNS)
+
+
 def _is_code_file(path: str) -> bool:
     dot = path.rfind(".")
     if dot == -1:
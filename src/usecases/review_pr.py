@@ -1,14 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 
 import httpx
+from pydantic import ValidationError
 
 from src.agent.factory import create_review_agent
 from src.agent.retry import run_agent_with_retry
-from src.db.engine import db_session
-from src.db.queries import get_org_language, get_repository, record_usage_event, save_review
+from src.db.queries import get_org_language, get_repository, save_review_with_usage
 from src.github import client as gh
 from src.models import PullRequest, RepoStatus, Review, ReviewComment, ReviewResponseSchema, extract_org
 
@@ -73,8 +74,11 @@ async def review_pr(pr: PullRequest) -> None:
 
     logger.info("Reviewing PR #%d on %s", pr.number, repo.full_name)
 
-    # Fetch diff files
-    pr.files = await gh.get_diff_files(repo.installation_id, repo.full_name, pr.number)
+    # Fetch diff files and the org language preference concurrently
+    pr.files, org_language = await asyncio.gather(
+        gh.get_diff_files(repo.installation_id, repo.full_name, pr.number),
+        get_org_language(extract_org(repo.full_name)),
+    )
     if not pr.files:
         logger.info("No files changed in PR #%d, skipping", pr.number)
         return
@@ -82,9 +86,6 @@ async def review_pr(pr: PullRequest) -> None:
     # Build diff text for the agent
     diff_text = _format_diff(pr)
 
-    # Look up org language preference
-    org_language = await get_org_language(extract_org(repo.full_name))
-
     # Create agent and run review
     agent = create_review_agent(repo.full_name, repo.installation_id, pr.head_sha, language=org_language)
     prompt = (
@@ -117,11 +118,14 @@ async def review_pr(pr: PullRequest) -> None:
         logger.exception("Failed to post review on PR #%d on %s", pr.number, repo.full_name)
         raise
 
-    org = extract_org(repo.full_name)
-    async with db_session() as session:
-        await save_review(repo.full_name, pr.number, result.body, len(result.comments), session=session)
-        await record_usage_event(org, repo.full_name, pr.number, pr.author, session=session)
-        await session.commit()
+    await save_review_with_usage(
+        extract_org(repo.full_name),
+        repo.full_name,
+        pr.number,
+        result.body,
+        len(result.comments),
+        pr.author,
+    )
     logger.info(
         "Posted review on PR #%d with %d comments",
         pr.number,
@@ -178,6 +182,13 @@ def _format_diff(pr: PullRequest) -> str:
     return "\n\n".join(parts)
 
 
+def _review_from_schema(schema: ReviewResponseSchema) -> Review:
+    return Review(
+        body=schema.summary,
+        comments=[ReviewComment(path=c.path, line=c.line, body=c.body) for c in schema.comments],
+    )
+
+
 def _extract_review(content) -> Review:
     """Convert the agent response content into a domain Review.
 
@@ -187,13 +198,15 @@ def _extract_review(content) -> Review:
     fallback.
     """
     if isinstance(content, ReviewResponseSchema):
-        return Review(
-            body=content.summary,
-            comments=[ReviewComment(path=c.path, line=c.line, body=c.body) for c in content.comments],
-        )
+        return _review_from_schema(content)
 
-    # Fallback: try to parse a raw string as JSON
+    # Fallback: try to parse a raw string as JSON.  Well-formed output
+    # validates in one pass; anything else gets the lenient parse below.
     raw = content if isinstance(content, str) else str(content)
+    try:
+        return _review_from_schema(ReviewResponseSchema.model_validate_json(raw))
+    except ValidationError:
+        pass
     try:
         data = json.loads(raw)
     except (json.JSONDecodeError, ValueError):
@@ -1 +1,15 @@
 """Root conftest — shared markers and configuration."""
+
+from __future__ import annotations
+
+import pytest
+
+from src.config import Settings
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _no_dotenv():
+    # Keep a developer's .env out of every Settings built under test
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(Settings.model_config, "env_file", None)
+        yield
@@ -1,17 +1,40 @@
-"""Integration test fixtures — testcontainer, settings override, table management."""
+"""Integration test fixtures — testcontainer, per-worker template database, settings override, table management."""
 
 from __future__ import annotations
 
+import hashlib
+import os
+
 import pytest
+import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import text
+from sqlalchemy import make_url, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateIndex, CreateTable
 from testcontainers.postgres import PostgresContainer
 
 from src.config import Settings, override_settings, reset_settings
 from src.db.engine import get_engine, reset_engine
+from src.db.queries import reset_billing_period_cache
 from src.db.tables import Base
 
-_tables_created = False
+# Template database holding the schema; named after a hash of the DDL so a
+# reused server never clones a stale schema after the models change.
+_SCHEMA_DDL = "".join(
+    str(CreateTable(t).compile(dialect=postgresql.dialect()))
+    + "".join(str(CreateIndex(i).compile(dialect=postgresql.dialect())) for i in t.indexes)
+    for t in Base.metadata.sorted_tables
+)
+_TEMPLATE_DB = f"louro_template_{hashlib.sha256(_SCHEMA_DDL.encode()).hexdigest()[:12]}"
+# Arbitrary key serializing template creation across xdist workers
+_TEMPLATE_LOCK_KEY = 0x6C6F75726F
+
+# One statement wipes every table between tests
+_TRUNCATE_ALL = text(
+    f"TRUNCATE {', '.join(t.name for t in Base.metadata.sorted_tables)} RESTART IDENTITY CASCADE",
+)
 
 
 @pytest.fixture(scope="session")
@@ -21,7 +44,12 @@ def postgres_container():
 
 
 @pytest.fixture(scope="session")
-def database_url(postgres_container) -> str:
+def server_url(request) -> str:
+    # Reuse an already running postgres (e.g. the CI service) instead of
+    # starting a container.  Its user needs CREATEDB for the test databases.
+    if url := os.environ.get("TEST_DATABASE_URL"):
+        return url
+    postgres_container = request.getfixturevalue("postgres_container")
     host = postgres_container.get_container_host_ip()
     port = postgres_container.get_exposed_port(5432)
     user = postgres_container.username
@@ -30,6 +58,53 @@ def database_url(postgres_container) -> str:
     return f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{dbname}"
 
 
+def _url_for(server_url: str, database: str) -> str:
+    return make_url(server_url).set(database=database).render_as_string(hide_password=False)
+
+
+async def _build_template(server_url: str) -> None:
+    engine = create_async_engine(_url_for(server_url, _TEMPLATE_DB), poolclass=NullPool)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            await conn.run_sync(Base.metadata.create_all)
+    finally:
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def database_url(server_url: str):
+    """A database for this worker, cloned from the schema template.
+
+    The template is built once per schema version (under an advisory lock, so
+    parallel workers don't race) and each worker gets a cheap file-level copy.
+    """
+    worker_db = f"louro_test_{os.environ.get('PYTEST_XDIST_WORKER', 'main')}"
+    admin = create_async_engine(server_url, isolation_level="AUTOCOMMIT", poolclass=NullPool)
+    async with admin.connect() as conn:
+        await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _TEMPLATE_LOCK_KEY})
+        try:
+            exists = await conn.scalar(text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": _TEMPLATE_DB})
+            if not exists:
+                await conn.execute(text(f'CREATE DATABASE "{_TEMPLATE_DB}"'))
+                try:
+                    await _build_template(server_url)
+                except BaseException:
+                    # Don't leave a half-built template for later runs to clone
+                    await conn.execute(text(f'DROP DATABASE IF EXISTS "{_TEMPLATE_DB}"'))
+                    raise
+            await conn.execute(text(f'DROP DATABASE IF EXISTS "{worker_db}"'))
+            await conn.execute(text(f'CREATE DATABASE "{worker_db}" TEMPLATE "{_TEMPLATE_DB}"'))
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _TEMPLATE_LOCK_KEY})
+
+    yield _url_for(server_url, worker_db)
+
+    async with admin.connect() as conn:
+        await conn.execute(text(f'DROP DATABASE IF EXISTS "{worker_db}" WITH (FORCE)'))
+    await admin.dispose()
+
+
 @pytest.fixture(scope="session", autouse=True)
 def _override_settings(database_url: str):
     test_settings = Settings(
@@ -38,6 +113,8 @@ def _override_settings(database_url: str):
         github_webhook_secret="test-secret",
         ai_gateway_api_key="test-gateway-key",
         database_url=database_url,
+        db_pool_size=20,
+        db_max_overflow=30,
         _env_file=None,
     )
     override_settings(test_settings)
@@ -45,28 +122,46 @@ def _override_settings(database_url: str):
     reset_settings()
 
 
-@pytest.fixture(autouse=True)
-async def _setup_and_clean(_override_settings):
-    global _tables_created
-    # Reset engine so it creates connections on the current event loop
-    await reset_engine()
-    if not _tables_created:
-        engine = get_engine()
-        async with engine.begin() as conn:
-            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-            await conn.run_sync(Base.metadata.create_all)
-        _tables_created = True
-    yield
-    # Truncate all tables after each test
+@pytest_asyncio.fixture(scope="session")
+async def _engine(_override_settings):
+    # The schema comes with the database cloned from the template
     engine = get_engine()
-    async with engine.begin() as conn:
-        for table in reversed(Base.metadata.sorted_tables):
-            await conn.execute(table.delete())
+    yield engine
     await reset_engine()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture(autouse=True)
+async def _clean_tables(request, _engine):
+    yield
+    # Cached ids would point at rows that are about to disappear
+    reset_billing_period_cache()
+    # Tests using ``db`` already rolled their writes back
+    if "db" in request.fixturenames:
+        return
+    async with _engine.begin() as conn:
+        await conn.execute(_TRUNCATE_ALL)
+
+
+@pytest_asyncio.fixture
+async def db(_engine, monkeypatch):
+    """Run the test inside one outer transaction that is rolled back afterwards.
+
+    Sessions opened by the query helpers join it through savepoints, so their
+    commits never reach the database.  They all share a single connection, so
+    tests that need truly concurrent sessions (e.g. race tests) can't use this.
+    """
+    async with _engine.connect() as conn:
+        trans = await conn.begin()
+        factory = async_sessionmaker(bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint")
+        monkeypatch.setattr("src.db.engine._session_factory", factory)
+        yield conn
+        await trans.rollback()
+
+
+@pytest_asyncio.fixture(scope="session")
 async def client():
+    # In-process ASGI calls, no socket.  Lifespan is skipped: the schema
+    # comes from the template database rather than migrations.
     from src.main import app
 
     transport = ASGITransport(app=app)
@@ -6,15 +6,19 @@ import asyncio
 from datetime import UTC, datetime
 
 import pytest
+from sqlalchemy import event
 
 from src.db.queries import (
+    _billing_period_ids,
     count_usage_events_for_period,
     get_active_users_for_period,
     get_billing_history,
     get_billing_summary,
     get_or_create_billing_period,
     get_usage_events_for_period,
+    get_usage_events_page,
     record_usage_event,
+    record_usage_events_bulk,
     track_active_user,
 )
 
@@ -52,6 +56,7 @@ class TestGetOrCreateBillingPeriod:
         assert results[0].id == results[1].id
 
 
+@pytest.mark.usefixtures("db")
 class TestTrackActiveUser:
     async def test_new_user_returns_true(self):
         result = await track_active_user("acme", "user1")
@@ -62,6 +67,34 @@ class TestTrackActiveUser:
         result = await track_active_user("acme", "user1")
         assert result is False
 
+    async def test_reuses_committed_period_id(self, db):
+        await track_active_user("acme", "user1")
+        assert "acme" in _billing_period_ids
+
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.sync_connection, "before_cursor_execute", record)
+        try:
+            await track_active_user("acme", "user2")
+            await record_usage_event("acme", "acme/repo", 1, "user1")
+        finally:
+            event.remove(db.sync_connection, "before_cursor_execute", record)
+        # The period was neither looked up nor upserted again, only updated
+        assert not [s for s in statements if "FROM billing_periods" in s or "INSERT INTO billing_periods" in s]
+
+        period = await get_or_create_billing_period("acme", datetime.now(UTC))
+        assert period.active_user_count == 2
+        assert period.review_count == 1
+
+    async def test_period_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr("src.db.queries._BILLING_PERIOD_CACHE_SIZE", 2)
+        for org in ("org-a", "org-b", "org-c"):
+            await track_active_user(org, "dev")
+        assert list(_billing_period_ids) == ["org-b", "org-c"]
+
     async def test_count_increments(self):
         now = datetime.now(UTC)
         await track_active_user("count-org", "u1")
@@ -71,6 +104,7 @@ class TestTrackActiveUser:
         assert period.active_user_count == 3
 
 
+@pytest.mark.usefixtures("db")
 class TestRecordUsageEvent:
     async def test_creates_event(self):
         event = await record_usage_event("acme", "acme/repo", 42, "dev")
@@ -92,12 +126,21 @@ class TestRecordUsageEvent:
         # 1 user, default cap 60 reviews per seat
         await track_active_user("cap-org", "solo")
         # Record 61 events to exceed cap
-        for i in range(61):
-            await record_usage_event("cap-org", "cap-org/r", i, "solo")
+        await record_usage_events_bulk("cap-org", [("cap-org/r", i, "solo") for i in range(61)])
         period = await get_or_create_billing_period("cap-org", now)
+        assert period.review_count == 61
         assert period.over_soft_cap is True
+        assert await count_usage_events_for_period(period.id) == 61
+
+    async def test_bulk_at_cap_is_not_over(self):
+        now = datetime.now(UTC)
+        await track_active_user("cap-org", "solo")
+        await record_usage_events_bulk("cap-org", [("cap-org/r", i, "solo") for i in range(60)])
+        period = await get_or_create_billing_period("cap-org", now)
+        assert period.over_soft_cap is False
 
 
+@pytest.mark.usefixtures("db")
 class TestGetBillingSummary:
     async def test_returns_current_month(self):
         now = datetime.now(UTC)
@@ -113,21 +156,22 @@ class TestGetBillingSummary:
 
 class TestGetBillingHistory:
     async def test_descending_order(self):
-        for month in [1, 3, 5]:
-            ref = datetime(2025, month, 1, tzinfo=UTC)
-            await get_or_create_billing_period("hist-org", ref)
+        await asyncio.gather(
+            *(get_or_create_billing_period("hist-org", datetime(2025, month, 1, tzinfo=UTC)) for month in (1, 3, 5))
+        )
         periods = await get_billing_history("hist-org")
         starts = [p.period_start for p in periods]
         assert starts == sorted(starts, reverse=True)
 
     async def test_respects_limit(self):
-        for month in range(1, 6):
-            ref = datetime(2025, month, 1, tzinfo=UTC)
-            await get_or_create_billing_period("lim-org", ref)
+        await asyncio.gather(
+            *(get_or_create_billing_period("lim-org", datetime(2025, month, 1, tzinfo=UTC)) for month in range(1, 6))
+        )
         periods = await get_billing_history("lim-org", limit=2)
         assert len(periods) == 2
 
 
+@pytest.mark.usefixtures("db")
 class TestGetActiveUsersForPeriod:
     async def test_correct_filtering(self):
         now = datetime.now(UTC)
@@ -139,6 +183,7 @@ class TestGetActiveUsersForPeriod:
         assert usernames == {"alice", "bob"}
 
 
+@pytest.mark.usefixtures("db")
 class TestGetUsageEventsForPeriod:
     async def test_correct_filtering(self):
         now = datetime.now(UTC)
@@ -152,9 +197,22 @@ class TestGetUsageEventsForPeriod:
 class TestCountUsageEventsForPeriod:
     async def test_correct_count(self):
         now = datetime.now(UTC)
-        await record_usage_event("cnt-org", "cnt-org/r", 1, "a")
-        await record_usage_event("cnt-org", "cnt-org/r", 2, "b")
-        await record_usage_event("cnt-org", "cnt-org/r", 3, "c")
+        await asyncio.gather(
+            record_usage_event("cnt-org", "cnt-org/r", 1, "a"),
+            record_usage_event("cnt-org", "cnt-org/r", 2, "b"),
+            record_usage_event("cnt-org", "cnt-org/r", 3, "c"),
+        )
         period = await get_or_create_billing_period("cnt-org", now)
         count = await count_usage_events_for_period(period.id)
         assert count == 3
+
+
+@pytest.mark.usefixtures("db")
+class TestGetUsageEventsPage:
+    async def test_page_and_total(self):
+        now = datetime.now(UTC)
+        await record_usage_events_bulk("pg-org", [("pg-org/r", i, "dev") for i in range(3)])
+        period = await get_or_create_billing_period("pg-org", now)
+        events, total = await get_usage_events_page(period.id, limit=2, offset=0)
+        assert len(events) == 2
+        assert total == 3
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+
 import pytest
 from httpx import AsyncClient
 
-from src.db.queries import upsert_repository
+from src.db.queries import set_repository_status, upsert_repositories, upsert_repository
 
 pytestmark = pytest.mark.integration
 
@@ -19,8 +21,7 @@ class TestListRepos:
         assert data["total"] == 0
 
     async def test_populated_list(self, client: AsyncClient):
-        await upsert_repository("acme/repo-a", 100)
-        await upsert_repository("acme/repo-b", 200)
+        await upsert_repositories([("acme/repo-a", 100, None), ("acme/repo-b", 200, None)])
         resp = await client.get("/repos")
         assert resp.status_code == 200
         data = resp.json()
@@ -31,10 +32,11 @@ class TestListRepos:
         assert "acme/repo-b" in names
 
     async def test_pagination(self, client: AsyncClient):
-        await upsert_repository("acme/repo-a", 100)
-        await upsert_repository("acme/repo-b", 200)
-        await upsert_repository("acme/repo-c", 300)
-        resp = await client.get("/repos?limit=2&offset=0")
+        await upsert_repositories([("acme/repo-a", 100, None), ("acme/repo-b", 200, None), ("acme/repo-c", 300, None)])
+        resp, resp2 = await asyncio.gather(
+            client.get("/repos?limit=2&offset=0"),
+            client.get("/repos?limit=2&offset=2"),
+        )
         assert resp.status_code == 200
         data = resp.json()
         assert data["total"] == 3
@@ -42,7 +44,6 @@ class TestListRepos:
         assert data["limit"] == 2
         assert data["offset"] == 0
 
-        resp2 = await client.get("/repos?limit=2&offset=2")
         data2 = resp2.json()
         assert data2["total"] == 3
         assert len(data2["repos"]) == 1
@@ -65,8 +66,6 @@ class TestGetRepo:
 class TestDeactivateRepo:
     async def test_sets_status_to_pending(self, client: AsyncClient):
         await upsert_repository("acme/deact", 100)
-        from src.db.queries import set_repository_status
-
         await set_repository_status("acme/deact", "active")
 
         resp = await client.post("/repos/acme/deact/deactivate")
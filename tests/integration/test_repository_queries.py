@@ -9,10 +9,11 @@ from src.db.queries import (
     get_repository,
     list_repositories,
     set_repository_status,
+    upsert_repositories,
     upsert_repository,
 )
 
-pytestmark = pytest.mark.integration
+pytestmark = [pytest.mark.integration, pytest.mark.usefixtures("db")]
 
 
 class TestUpsertRepository:
@@ -31,6 +32,19 @@ class TestUpsertRepository:
         assert updated.default_branch == "develop"
 
 
+class TestUpsertRepositories:
+    async def test_inserts_and_updates_in_one_batch(self):
+        await upsert_repository("acme/existing", 100, "main")
+        await upsert_repositories([("acme/existing", 200, "develop"), ("acme/fresh", 300, None)])
+
+        existing = await get_repository("acme/existing")
+        fresh = await get_repository("acme/fresh")
+        assert existing is not None
+        assert (existing.installation_id, existing.default_branch) == (200, "develop")
+        assert fresh is not None
+        assert (fresh.installation_id, fresh.default_branch, fresh.status) == (300, "main", "pending")
+
+
 class TestGetRepository:
     async def test_found(self):
         await upsert_repository("acme/found", 100)
@@ -45,12 +59,10 @@ class TestGetRepository:
 
 class TestListRepositories:
     async def test_ordered_by_full_name(self):
-        await upsert_repository("zeta/repo", 1)
-        await upsert_repository("alpha/repo", 2)
-        await upsert_repository("mid/repo", 3)
-        repos = await list_repositories()
-        names = [r.full_name for r in repos]
-        assert names == sorted(names)
+        await upsert_repositories([("zeta/repo", 1, None), ("alpha/repo", 2, None), ("mid/repo", 3, None)])
+        repos, total = await list_repositories()
+        assert total == 3
+        assert [r.full_name for r in repos] == ["alpha/repo", "mid/repo", "zeta/repo"]
 
 
 class TestSetRepositoryStatus:
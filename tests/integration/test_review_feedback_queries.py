@@ -1,10 +1,21 @@
-"""Integration tests for save_review and save_feedback in src/db/queries.py."""
+"""Integration tests for save_review, save_review_with_usage and save_feedback in src/db/queries.py."""
 
 from __future__ import annotations
 
+from datetime import UTC, datetime
+
 import pytest
+import pytest_asyncio
 
-from src.db.queries import save_feedback, save_review, upsert_repository
+from src.db.queries import (
+    count_usage_events_for_period,
+    get_or_create_billing_period,
+    save_feedback,
+    save_review,
+    save_review_with_usage,
+    track_active_user,
+    upsert_repository,
+)
 
 pytestmark = pytest.mark.integration
 
@@ -12,8 +23,8 @@ REPO_NAME = "acme/repo"
 INSTALLATION_ID = 1
 
 
-@pytest.fixture(autouse=True)
-async def _create_repo():
+@pytest_asyncio.fixture(autouse=True)
+async def _create_repo(db):
     """Ensure the parent repository exists so FK constraints are satisfied."""
     await upsert_repository(REPO_NAME, INSTALLATION_ID)
 
@@ -32,6 +43,24 @@ class TestSaveReview:
         assert review.created_at is not None
 
 
+class TestSaveReviewWithUsage:
+    async def test_records_usage_and_increments_review_count(self):
+        await save_review_with_usage("acme", REPO_NAME, 7, "LGTM", 2, "dev")
+        await save_review_with_usage("acme", REPO_NAME, 8, "Nits", 1, "dev")
+        period = await get_or_create_billing_period("acme", datetime.now(UTC))
+        assert period.review_count == 2
+        assert await count_usage_events_for_period(period.id) == 2
+
+    async def test_updates_existing_period(self):
+        now = datetime.now(UTC)
+        await track_active_user("acme", "dev")
+        await save_review_with_usage("acme", REPO_NAME, 7, "LGTM", 0, "dev")
+        period = await get_or_create_billing_period("acme", now)
+        assert period.active_user_count == 1
+        assert period.review_count == 1
+        assert period.over_soft_cap is False
+
+
 class TestSaveFeedback:
     async def test_correct_fields(self):
         fb = await save_feedback(REPO_NAME, "original", "response", "positive")
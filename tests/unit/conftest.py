@@ -1,96 +1,138 @@
-"""Unit test fixtures — sample payloads and domain objects."""
+"""Unit test fixtures — sample payloads, domain objects and signing keys."""
 
 from __future__ import annotations
 
+import copy
+
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 
-from src.models import FileDiff, PullRequest, Repository
+from src.models import FileDiff, PullRequest, Repository, ReviewCommentSchema, ReviewResponseSchema
 
 
-@pytest.fixture
-def sample_repo() -> Repository:
-    return Repository(
-        full_name="acme/web-app",
-        installation_id=12345,
-        default_branch="main",
+@pytest.fixture(scope="session")
+def rsa_private_key() -> bytes:
+    """PEM-encoded RSA key for JWT signing, generated once per session (keygen is slow).
+
+    1024 bits is plenty for tests and several times cheaper to generate than 2048.
+    """
+    key = rsa.generate_private_key(public_exponent=65537, key_size=1024)
+    return key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
     )
 
 
-@pytest.fixture
-def sample_pr(sample_repo: Repository) -> PullRequest:
-    return PullRequest(
-        number=42,
-        title="Add login feature",
-        body="Implements OAuth login flow",
-        head_sha="abc123",
-        base_branch="main",
-        head_branch="feature/login",
-        repo=sample_repo,
-        author="dev-user",
-        files=[
-            FileDiff(
-                filename="src/auth.py",
-                status="added",
-                patch="@@ -0,0 +1,10 @@\n+def login():\n+    pass",
-                additions=10,
-                deletions=0,
-            ),
-            FileDiff(
-                filename="src/routes.py",
-                status="modified",
-                patch="@@ -5,3 +5,5 @@\n-# old\n+# new",
-                additions=2,
-                deletions=1,
-            ),
-        ],
+@pytest.fixture(scope="session")
+def review_response_schema() -> ReviewResponseSchema:
+    """Structured agent review with one comment; shared, so don't mutate it."""
+    return ReviewResponseSchema(
+        summary="All good",
+        comments=[ReviewCommentSchema(path="a.py", line=1, body="fix")],
     )
 
 
+# Canonical domain objects; fixtures hand out deep copies so a test that mutates one can't leak it
+_SAMPLE_REPO = Repository(
+    full_name="acme/web-app",
+    installation_id=12345,
+    default_branch="main",
+)
+
+_SAMPLE_PR = PullRequest(
+    number=42,
+    title="Add login feature",
+    body="Implements OAuth login flow",
+    head_sha="abc123",
+    base_branch="main",
+    head_branch="feature/login",
+    repo=_SAMPLE_REPO,
+    author="dev-user",
+    files=[
+        FileDiff(
+            filename="src/auth.py",
+            status="added",
+            patch="@@ -0,0 +1,10 @@\n+def login():\n+    pass",
+            additions=10,
+            deletions=0,
+        ),
+        FileDiff(
+            filename="src/routes.py",
+            status="modified",
+            patch="@@ -5,3 +5,5 @@\n-# old\n+# new",
+            additions=2,
+            deletions=1,
+        ),
+    ],
+)
+
+
+@pytest.fixture
+def sample_pr() -> PullRequest:
+    return copy.deepcopy(_SAMPLE_PR)
+
+
+@pytest.fixture
+def sample_repo(sample_pr: PullRequest) -> Repository:
+    # Same object as sample_pr.repo, as when both were built together
+    return sample_pr.repo
+
+
+# Canonical webhook payloads; fixtures hand out deep copies because tests mutate nested keys
+_PR_PAYLOAD = {
+    "pull_request": {
+        "number": 1,
+        "title": "Test PR",
+        "body": "description",
+        "head": {"sha": "abc123", "ref": "feature"},
+        "base": {"ref": "main"},
+        "user": {"login": "dev"},
+    },
+    "repository": {
+        "full_name": "acme/repo",
+        "default_branch": "main",
+    },
+    "installation": {"id": 100},
+}
+
+_COMMENT_PAYLOAD = {
+    "comment": {
+        "id": 999,
+        "body": "Looks good!",
+        "path": "src/main.py",
+        "line": 10,
+        "original_line": 8,
+        "diff_hunk": "@@ -1,5 +1,5 @@",
+    },
+    "repository": {
+        "full_name": "acme/repo",
+        "default_branch": "main",
+    },
+    "pull_request": {"number": 42},
+    "installation": {"id": 100},
+}
+
+_INSTALLATION_PAYLOAD = {
+    "installation": {"id": 200},
+    "repositories": [
+        {"full_name": "acme/repo-a"},
+        {"full_name": "acme/repo-b"},
+    ],
+}
+
+
 @pytest.fixture
 def minimal_pr_payload() -> dict:
-    return {
-        "pull_request": {
-            "number": 1,
-            "title": "Test PR",
-            "body": "description",
-            "head": {"sha": "abc123", "ref": "feature"},
-            "base": {"ref": "main"},
-            "user": {"login": "dev"},
-        },
-        "repository": {
-            "full_name": "acme/repo",
-            "default_branch": "main",
-        },
-        "installation": {"id": 100},
-    }
+    return copy.deepcopy(_PR_PAYLOAD)
 
 
 @pytest.fixture
 def minimal_comment_payload() -> dict:
-    return {
-        "comment": {
-            "id": 999,
-            "body": "Looks good!",
-            "path": "src/main.py",
-            "line": 10,
-            "original_line": 8,
-            "diff_hunk": "@@ -1,5 +1,5 @@",
-        },
-        "repository": {
-            "full_name": "acme/repo",
-            "default_branch": "main",
-        },
-        "pull_request": {"number": 42},
-        "installation": {"id": 100},
-    }
+    return copy.deepcopy(_COMMENT_PAYLOAD)
 
 
 @pytest.fixture
 def minimal_installation_payload() -> dict:
-    return {
-        "installation": {"id": 200},
-        "repositories": [
-            {"full_name": "acme/repo-a"},
-            {"full_name": "acme/repo-b"},
-        ],
-    }
+    return copy.deepcopy(_INSTALLATION_PAYLOAD)
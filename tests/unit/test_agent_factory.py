@@ -4,9 +4,15 @@ from __future__ import annotations
 
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+from src.agent.factory import _build_model_for_id, create_onboard_agent, create_review_agent
 from src.config import Settings
 
-# Common valid settings kwargs
+# Shared knowledge-base stand-in; spec=[] keeps it from growing child mocks
+_NOOP_KB = MagicMock(name="kb", spec=[])
+
+# Common valid settings kwargs; every other field keeps its declared default
 _BASE = {
     "github_app_id": "123",
     "github_private_key": "test-key",
@@ -15,17 +21,23 @@ _BASE = {
 }
 
 
-def _settings(**overrides) -> Settings:
-    return Settings(**{**_BASE, **overrides}, _env_file=None)
+@pytest.fixture(scope="session")
+def base_settings() -> Settings:
+    # Trusted test values: skip validation and the env/.env sources entirely
+    return Settings.model_construct(**_BASE)
+
+
+@pytest.fixture
+def patched_factory_settings(base_settings, monkeypatch) -> Settings:
+    monkeypatch.setattr("src.agent.factory.get_settings", lambda: base_settings)
+    return base_settings
 
 
 class TestBuildModelForId:
-    def test_returns_openai_like_with_gateway_config(self, monkeypatch):
-        settings = _settings(ai_gateway_base_url="https://gw.example.com/v1")
+    def test_returns_openai_like_with_gateway_config(self, base_settings, monkeypatch):
+        settings = base_settings.model_copy(update={"ai_gateway_base_url": "https://gw.example.com/v1"})
         monkeypatch.setattr("src.agent.factory.get_settings", lambda: settings)
 
-        from src.agent.factory import _build_model_for_id
-
         model = _build_model_for_id("anthropic/claude-sonnet-4-5-20250929")
         assert type(model).__name__ == "OpenAILike"
         assert model.api_key == "gw-key"
@@ -33,24 +45,15 @@ class TestBuildModelForId:
 
 
 class TestCreateReviewAgent:
-    def test_has_knowledge(self, monkeypatch):
-        settings = _settings()
-        monkeypatch.setattr("src.agent.factory.get_settings", lambda: settings)
-
-        from src.agent.factory import create_review_agent
-
-        with patch("src.agent.factory.get_knowledge_base") as mock_kb:
-            mock_kb.return_value = MagicMock()
+    @pytest.mark.usefixtures("patched_factory_settings")
+    def test_has_knowledge(self):
+        with patch("src.agent.factory.get_knowledge_base", return_value=_NOOP_KB):
             agent = create_review_agent("acme/repo", 1, "HEAD")
-            assert agent.knowledge is not None
+            assert agent.knowledge is _NOOP_KB
 
 
 class TestCreateOnboardAgent:
-    def test_has_no_knowledge(self, monkeypatch):
-        settings = _settings()
-        monkeypatch.setattr("src.agent.factory.get_settings", lambda: settings)
-
-        from src.agent.factory import create_onboard_agent
-
+    @pytest.mark.usefixtures("patched_factory_settings")
+    def test_has_no_knowledge(self):
         agent = create_onboard_agent("acme/repo", 1, "main")
         assert agent.knowledge is None
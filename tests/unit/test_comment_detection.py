@@ -3,12 +3,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from types import SimpleNamespace
 from typing import Any
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock
 
 import pytest
 
-from src.agent.classifier import CommentClassification, classify_comment
+from src.agent.classifier import (
+    CommentClassification,
+    _classification_cache,
+    classify_comment,
+    reset_classification_cache,
+)
 
 
 @dataclass
@@ -19,78 +25,97 @@ class FakeModelResponse:
 
 MOCK_PATH = "src.agent.classifier.build_classifier_model"
 
+_POSITIVE = CommentClassification(sentiment="positive", is_pattern_correction=False)
+_NEUTRAL_RESPONSE = FakeModelResponse(parsed=CommentClassification(sentiment="neutral", is_pattern_correction=False))
+
+
+def _install_model(monkeypatch, response=None, *, side_effect=None) -> SimpleNamespace:
+    """Make build_classifier_model return a stub whose aresponse yields *response*."""
+    model = SimpleNamespace(aresponse=AsyncMock(return_value=response, side_effect=side_effect))
+    monkeypatch.setattr(MOCK_PATH, lambda: model)
+    return model
+
+
+@pytest.fixture(autouse=True)
+def _clean_cache():
+    reset_classification_cache()
+    yield
+    reset_classification_cache()
+
 
 class TestClassifyComment:
     @pytest.mark.asyncio
-    async def test_uses_parsed_structured_output(self):
-        expected = CommentClassification(sentiment="positive", is_pattern_correction=False)
-        model = AsyncMock()
-        model.aresponse.return_value = FakeModelResponse(parsed=expected)
+    async def test_uses_parsed_structured_output(self, monkeypatch):
+        model = _install_model(monkeypatch, FakeModelResponse(parsed=_POSITIVE))
 
-        with patch(MOCK_PATH, return_value=model):
-            result = await classify_comment("Thanks!")
+        result = await classify_comment("Thanks!")
 
-        assert result == expected
+        assert result == _POSITIVE
         model.aresponse.assert_awaited_once()
 
     @pytest.mark.asyncio
-    async def test_falls_back_to_json_text_parsing(self):
-        model = AsyncMock()
-        model.aresponse.return_value = FakeModelResponse(
-            parsed=None,
-            content='{"sentiment": "negative", "is_pattern_correction": true}',
+    async def test_falls_back_to_json_text_parsing(self, monkeypatch):
+        _install_model(
+            monkeypatch,
+            FakeModelResponse(parsed=None, content='{"sentiment": "negative", "is_pattern_correction": true}'),
         )
 
-        with patch(MOCK_PATH, return_value=model):
-            result = await classify_comment("That's wrong")
+        result = await classify_comment("That's wrong")
 
         assert result.sentiment == "negative"
         assert result.is_pattern_correction is True
 
     @pytest.mark.asyncio
-    async def test_handles_json_in_markdown_code_fence(self):
-        model = AsyncMock()
-        model.aresponse.return_value = FakeModelResponse(
-            parsed=None,
-            content='```json\n{"sentiment": "positive", "is_pattern_correction": false}\n```',
+    async def test_handles_json_in_markdown_code_fence(self, monkeypatch):
+        _install_model(
+            monkeypatch,
+            FakeModelResponse(
+                parsed=None,
+                content='```json\n{"sentiment": "positive", "is_pattern_correction": false}\n```',
+            ),
         )
 
-        with patch(MOCK_PATH, return_value=model):
-            result = await classify_comment("Good point!")
+        result = await classify_comment("Good point!")
 
         assert result.sentiment == "positive"
         assert result.is_pattern_correction is False
 
     @pytest.mark.asyncio
-    async def test_returns_safe_defaults_on_api_error(self):
-        model = AsyncMock()
-        model.aresponse.side_effect = RuntimeError("API error")
+    async def test_extracts_json_object_surrounded_by_text(self, monkeypatch):
+        _install_model(
+            monkeypatch,
+            FakeModelResponse(
+                parsed=None, content='Here you go:\n{"sentiment": "negative", "is_pattern_correction": false}'
+            ),
+        )
+
+        result = await classify_comment("Nope")
+
+        assert result.sentiment == "negative"
+
+    @pytest.mark.asyncio
+    async def test_returns_safe_defaults_on_api_error(self, monkeypatch):
+        _install_model(monkeypatch, side_effect=RuntimeError("API error"))
 
-        with patch(MOCK_PATH, return_value=model):
-            result = await classify_comment("some comment")
+        result = await classify_comment("some comment")
 
         assert result.sentiment == "neutral"
         assert result.is_pattern_correction is False
 
     @pytest.mark.asyncio
-    async def test_returns_safe_defaults_on_empty_response(self):
-        model = AsyncMock()
-        model.aresponse.return_value = FakeModelResponse(parsed=None, content="")
+    async def test_returns_safe_defaults_on_empty_response(self, monkeypatch):
+        _install_model(monkeypatch, FakeModelResponse(parsed=None, content=""))
 
-        with patch(MOCK_PATH, return_value=model):
-            result = await classify_comment("some comment")
+        result = await classify_comment("some comment")
 
         assert result.sentiment == "neutral"
         assert result.is_pattern_correction is False
 
     @pytest.mark.asyncio
-    async def test_sends_correct_message_structure(self):
-        expected = CommentClassification(sentiment="neutral", is_pattern_correction=False)
-        model = AsyncMock()
-        model.aresponse.return_value = FakeModelResponse(parsed=expected)
+    async def test_sends_correct_message_structure(self, monkeypatch):
+        model = _install_model(monkeypatch, _NEUTRAL_RESPONSE)
 
-        with patch(MOCK_PATH, return_value=model):
-            await classify_comment("test body")
+        await classify_comment("test body")
 
         call_kwargs = model.aresponse.call_args
         messages = call_kwargs.kwargs["messages"]
@@ -101,15 +126,55 @@ class TestClassifyComment:
         assert call_kwargs.kwargs["response_format"] is CommentClassification
 
     @pytest.mark.asyncio
-    async def test_handles_list_content_in_response(self):
-        model = AsyncMock()
-        model.aresponse.return_value = FakeModelResponse(
-            parsed=None,
-            content=['{"sentiment": "positive",', ' "is_pattern_correction": false}'],
+    async def test_handles_list_content_in_response(self, monkeypatch):
+        _install_model(
+            monkeypatch,
+            FakeModelResponse(parsed=None, content=['{"sentiment": "positive",', ' "is_pattern_correction": false}']),
         )
 
-        with patch(MOCK_PATH, return_value=model):
-            result = await classify_comment("Thanks!")
+        result = await classify_comment("Thanks!")
 
         assert result.sentiment == "positive"
         assert result.is_pattern_correction is False
+
+    @pytest.mark.asyncio
+    async def test_repeated_body_is_served_from_cache(self, monkeypatch):
+        model = _install_model(monkeypatch, FakeModelResponse(parsed=_POSITIVE))
+
+        first = await classify_comment("Thanks!")
+        second = await classify_comment("Thanks!")
+
+        assert first == second == _POSITIVE
+        model.aresponse.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, monkeypatch):
+        expected = CommentClassification(sentiment="negative", is_pattern_correction=True)
+        _install_model(monkeypatch, side_effect=[RuntimeError("API error"), FakeModelResponse(parsed=expected)])
+
+        first = await classify_comment("That's wrong")
+        second = await classify_comment("That's wrong")
+
+        assert first.sentiment == "neutral"
+        assert second == expected
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_least_recently_used(self, monkeypatch):
+        monkeypatch.setattr("src.agent.classifier._CACHE_MAX_ENTRIES", 2)
+        model = _install_model(monkeypatch, FakeModelResponse(parsed=_POSITIVE))
+
+        for body in ("a", "b", "a", "c", "a"):
+            await classify_comment(body)
+
+        # "a" was used again before "c" came in, so "b" is the one dropped and "a" stays cached
+        assert model.aresponse.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_dropped_when_read(self, monkeypatch):
+        monkeypatch.setattr("src.agent.classifier._CACHE_TTL", 0.0)
+        _install_model(monkeypatch, side_effect=[FakeModelResponse(parsed=_POSITIVE), RuntimeError("API error")])
+
+        await classify_comment("Thanks!")
+        await classify_comment("Thanks!")
+
+        assert not _classification_cache
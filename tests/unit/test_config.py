@@ -16,18 +16,36 @@ _VALID = {
 }
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _init_kwargs_only():
+    # Only the kwargs under test count: exported GITHUB_* / AI_GATEWAY_* vars
+    # (e.g. in CI) would otherwise satisfy the "missing" validation cases.
+    def init_only(cls, settings_cls, init_settings, *args, **kwargs):
+        return (init_settings,)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(Settings, "settings_customise_sources", classmethod(init_only))
+        yield
+
+
 def _settings(**overrides) -> Settings:
     return Settings(**{**_VALID, **overrides}, _env_file=None)
 
 
+@pytest.fixture(scope="module")
+def valid_settings() -> Settings:
+    # Shared by tests that only read from a valid instance
+    return _settings()
+
+
 class TestConfigValidation:
-    def test_valid_config(self):
-        s = _settings()
-        assert s.github_app_id == "123"
+    def test_valid_config(self, valid_settings):
+        assert valid_settings.github_app_id == "123"
 
     def test_missing_private_key_raises(self):
-        with pytest.raises(ValidationError, match="GITHUB_PRIVATE_KEY"):
+        with pytest.raises(ValidationError) as exc_info:
             _settings(github_private_key="", github_private_key_path="")
+        assert "GITHUB_PRIVATE_KEY" in str(exc_info.value)
 
     def test_private_key_path_is_accepted(self):
         s = _settings(github_private_key="", github_private_key_path="/tmp/key.pem")
@@ -41,15 +59,14 @@ class TestConfigValidation:
 
 
 class TestPgvectorUrl:
-    def test_replaces_asyncpg_with_psycopg(self):
-        s = _settings(database_url="postgresql+asyncpg://u:p@host/db")
+    def test_replaces_asyncpg_with_psycopg(self, valid_settings):
+        s = valid_settings.model_copy(update={"database_url": "postgresql+asyncpg://u:p@host/db"})
         assert s.pgvector_url == "postgresql+psycopg://u:p@host/db"
 
 
 class TestGetGithubPrivateKeyBytes:
-    def test_from_string(self):
-        s = _settings()
-        assert s.get_github_private_key_bytes() == b"test-key"
+    def test_from_string(self, valid_settings):
+        assert valid_settings.get_github_private_key_bytes() == b"test-key"
 
     def test_from_file(self, tmp_path):
         key_file = tmp_path / "key.pem"
@@ -15,8 +15,12 @@ from src.github.auth import (
     reset_token_cache,
 )
 
+# The session test key is deliberately short; PyJWT >= 2.11 warns about that on
+# signing.  Match on the message, since older releases lack the warning class.
+pytestmark = pytest.mark.filterwarnings("ignore:The RSA key is 1024 bits long")
 
-@pytest.fixture(autouse=True)
+
+@pytest.fixture
 def _clean_cache():
     reset_token_cache()
     yield
@@ -24,7 +28,7 @@ def _clean_cache():
 
 
 class TestMakeJWT:
-    def test_returns_string(self, monkeypatch):
+    def test_returns_string(self, monkeypatch, rsa_private_key):
         monkeypatch.setattr(
             "src.github.auth.get_settings",
             lambda: type(
@@ -32,7 +36,7 @@ class TestMakeJWT:
                 (),
                 {
                     "github_app_id": "12345",
-                    "get_github_private_key_bytes": lambda self: _rsa_key(),
+                    "get_github_private_key_bytes": lambda self: rsa_private_key,
                 },
             )(),
         )
@@ -43,6 +47,7 @@ class TestMakeJWT:
 
 
 class TestTokenCache:
+    @pytest.mark.usefixtures("_clean_cache")
     def test_invalidate_removes_entry(self):
         _token_cache[42] = ("tok", time.time() + 9999)
         invalidate_token(42)
@@ -52,6 +57,7 @@ class TestTokenCache:
         invalidate_token(999)  # should not raise
 
 
+@pytest.mark.usefixtures("_clean_cache")
 class TestGetInstallationToken:
     async def test_returns_cached_token_when_valid(self):
         _token_cache[1] = ("cached-tok", time.time() + 600)
@@ -60,18 +66,8 @@ class TestGetInstallationToken:
 
     async def test_fetches_new_token_when_expired(self, monkeypatch):
         _token_cache[1] = ("old-tok", time.time() - 1)
-
-        monkeypatch.setattr(
-            "src.github.auth.get_settings",
-            lambda: type(
-                "S",
-                (),
-                {
-                    "github_app_id": "12345",
-                    "get_github_private_key_bytes": lambda self: _rsa_key(),
-                },
-            )(),
-        )
+        # The JWT itself is covered by TestMakeJWT; skip the RSA signing here
+        monkeypatch.setattr("src.github.auth._make_jwt", lambda: "test.jwt.token")
 
         mock_resp = MagicMock()
         mock_resp.raise_for_status = MagicMock()
@@ -87,16 +83,4 @@ class TestGetInstallationToken:
 
         assert token == "new-tok"
         assert _token_cache[1][0] == "new-tok"
-
-
-def _rsa_key() -> bytes:
-    """Generate a minimal RSA private key for JWT signing in tests."""
-    from cryptography.hazmat.primitives import serialization
-    from cryptography.hazmat.primitives.asymmetric import rsa
-
-    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
-    return key.private_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.PKCS8,
-        encryption_algorithm=serialization.NoEncryption(),
-    )
+        assert mock_client_instance.post.call_args.kwargs["headers"]["Authorization"] == "Bearer test.jwt.token"
@@ -7,7 +7,12 @@ from unittest.mock import AsyncMock, patch
 import httpx
 import pytest
 
-from src.github.client import close_client, get_diff_files, get_file_content
+from src.github.client import _CONNECT_RETRIES, _get_client, close_client, get_diff_files, get_file_content
+
+# Canned contents responses; read-only, so tests can share them
+_REQUEST = httpx.Request("GET", "http://test")
+_RESP_404 = httpx.Response(404, request=_REQUEST)
+_RESP_200 = httpx.Response(200, text="file content", request=_REQUEST)
 
 
 @pytest.fixture(autouse=True)
@@ -16,6 +21,23 @@ async def _clean_client():
     await close_client()
 
 
+class TestSharedClient:
+    async def test_client_is_reused_until_closed(self):
+        client = _get_client()
+        assert _get_client() is client
+
+        await close_client()
+        assert _get_client() is not client
+
+    def test_transport_enables_http2(self):
+        # http2 only takes effect on the transport; the client-level flag is ignored once transport= is passed
+        with patch("httpx.AsyncHTTPTransport", wraps=httpx.AsyncHTTPTransport) as transport_cls:
+            _get_client()
+        kwargs = transport_cls.call_args.kwargs
+        assert kwargs["http2"] is True
+        assert kwargs["retries"] == _CONNECT_RETRIES
+
+
 class TestGetDiffFiles:
     async def test_maps_response_to_file_diffs(self, monkeypatch):
         raw = [
@@ -45,13 +67,36 @@ class TestGetDiffFiles:
 
 class TestGetFileContent:
     async def test_404_returns_empty_string(self, monkeypatch):
-        resp = httpx.Response(404, request=httpx.Request("GET", "http://test"))
-        with patch("src.github.client._request", new_callable=AsyncMock, return_value=resp):
+        with patch("src.github.client._request", new_callable=AsyncMock, return_value=_RESP_404):
             result = await get_file_content(1, "owner/repo", "missing.py", "main")
         assert result == ""
 
     async def test_200_returns_text(self, monkeypatch):
-        resp = httpx.Response(200, text="file content", request=httpx.Request("GET", "http://test"))
-        with patch("src.github.client._request", new_callable=AsyncMock, return_value=resp):
+        with patch("src.github.client._request", new_callable=AsyncMock, return_value=_RESP_200):
             result = await get_file_content(1, "owner/repo", "src/main.py", "main")
         assert result == "file content"
+
+    async def test_max_bytes_requests_range(self):
+        resp = httpx.Response(206, content=b"head", request=_REQUEST)
+        with patch("src.github.client._request", new_callable=AsyncMock, return_value=resp) as mock_request:
+            result = await get_file_content(1, "owner/repo", "big.js", "main", max_bytes=4)
+        assert result == "head"
+        assert mock_request.call_args.kwargs["headers"]["Range"] == "bytes=0-3"
+
+    async def test_max_bytes_on_empty_file_returns_empty_string(self):
+        resp = httpx.Response(416, request=_REQUEST)
+        with patch("src.github.client._request", new_callable=AsyncMock, return_value=resp):
+            result = await get_file_content(1, "owner/repo", "empty.py", "main", max_bytes=4)
+        assert result == ""
+
+    async def test_max_bytes_slices_when_range_ignored(self):
+        resp = httpx.Response(200, content="abcé".encode(), request=_REQUEST)
+        with patch("src.github.client._request", new_callable=AsyncMock, return_value=resp):
+            result = await get_file_content(1, "owner/repo", "big.js", "main", max_bytes=4)
+        assert result == "abc"
+
+    async def test_max_bytes_replaces_invalid_bytes_before_the_cut(self):
+        resp = httpx.Response(206, content=b"a\xffb\xc3", request=_REQUEST)
+        with patch("src.github.client._request", new_callable=AsyncMock, return_value=resp):
+            result = await get_file_content(1, "owner/repo", "big.js", "main", max_bytes=4)
+        assert result == "a\ufffdb"
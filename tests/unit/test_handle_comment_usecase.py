@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
+from operator import attrgetter
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from src.agent.classifier import CommentClassification
 from src.models import CommentEvent, Repository, RepoStatus
+from src.usecases.handle_comment import handle_comment
 
 
 @pytest.fixture
@@ -30,154 +33,107 @@ def comment_event(repo):
     )
 
 
-def _make_repo_record(status: str = RepoStatus.ACTIVE):
-    return SimpleNamespace(status=status)
+# Read-only stand-ins shared across tests
+_ACTIVE_REPO_RECORD = SimpleNamespace(status=RepoStatus.ACTIVE)
+_PENDING_REPO_RECORD = SimpleNamespace(status=RepoStatus.PENDING)
+_METRICS = SimpleNamespace(input_tokens=50)
+_CORRECTION_REPLY = SimpleNamespace(content="Thanks for the clarification!", metrics=_METRICS)
+_POSITIVE_REPLY = SimpleNamespace(content="Glad you agree!", metrics=_METRICS)
+_PLAIN_REPLY = SimpleNamespace(content="Reply text", metrics=_METRICS)
 
 
-@patch("src.usecases.handle_comment.get_repository", new_callable=AsyncMock, return_value=None)
-@patch("src.usecases.handle_comment.gh")
-async def test_handle_comment_skips_when_repo_not_found(mock_gh, mock_get_repo, comment_event):
-    from src.usecases.handle_comment import handle_comment
+@pytest.fixture
+def mocks():
+    """Patch every collaborator of handle_comment at once; tests tweak the returned mocks."""
+    ns = SimpleNamespace(
+        get_repository=AsyncMock(return_value=_ACTIVE_REPO_RECORD),
+        gh=MagicMock(get_review_comments=AsyncMock(return_value=[]), reply_comment=AsyncMock()),
+        create_comment_agent=MagicMock(),
+        run_agent_with_retry=AsyncMock(),
+        classify_comment=AsyncMock(),
+        save_feedback=AsyncMock(),
+        store_feedback=AsyncMock(),
+        store_evolution=AsyncMock(),
+        get_org_language=AsyncMock(return_value="en-US"),
+    )
+    with patch.multiple("src.usecases.handle_comment", **vars(ns)):
+        yield ns
 
-    await handle_comment(comment_event)
 
-    mock_gh.get_review_comments.assert_not_awaited() if hasattr(
-        mock_gh.get_review_comments, "assert_not_awaited"
-    ) else None
-    mock_gh.reply_comment.assert_not_called()
+def _expect_awaits(mocks: SimpleNamespace, expected: dict[str, int]) -> None:
+    """Assert await counts by (dotted) mock name in one comparison, so a failure shows them all."""
+    assert {name: attrgetter(name)(mocks).await_count for name in expected} == expected
 
 
-@patch(
-    "src.usecases.handle_comment.get_repository",
-    new_callable=AsyncMock,
-    return_value=_make_repo_record(RepoStatus.PENDING),
-)
-@patch("src.usecases.handle_comment.gh")
-async def test_handle_comment_skips_when_repo_not_active(mock_gh, mock_get_repo, comment_event):
-    from src.usecases.handle_comment import handle_comment
+async def test_handle_comment_skips_when_repo_not_found(mocks, comment_event):
+    mocks.get_repository.return_value = None
 
     await handle_comment(comment_event)
 
-    mock_gh.reply_comment.assert_not_called()
+    _expect_awaits(mocks, {"gh.get_review_comments": 0, "gh.reply_comment": 0})
 
 
-def _make_response(content: str):
-    return SimpleNamespace(
-        content=content,
-        metrics=SimpleNamespace(input_tokens=50),
-    )
+async def test_handle_comment_skips_when_repo_not_active(mocks, comment_event):
+    mocks.get_repository.return_value = _PENDING_REPO_RECORD
+
+    await handle_comment(comment_event)
 
+    mocks.gh.reply_comment.assert_not_awaited()
 
-@patch("src.usecases.handle_comment.get_repository", new_callable=AsyncMock, return_value=_make_repo_record())
-@patch("src.usecases.handle_comment.gh")
-@patch("src.usecases.handle_comment.create_comment_agent")
-@patch("src.usecases.handle_comment.run_agent_with_retry")
-@patch("src.usecases.handle_comment.classify_comment")
-@patch("src.usecases.handle_comment.save_feedback", new_callable=AsyncMock)
-@patch("src.usecases.handle_comment.store_feedback", new_callable=AsyncMock)
-@patch("src.usecases.handle_comment.store_evolution", new_callable=AsyncMock)
-@patch("src.usecases.handle_comment.get_org_language", new_callable=AsyncMock, return_value="en-US")
-async def test_handle_comment_with_pattern_correction(
-    mock_get_lang,
-    mock_store_evolution,
-    mock_store_feedback,
-    mock_save_feedback,
-    mock_classify,
-    mock_run_agent,
-    mock_create_agent,
-    mock_gh,
-    mock_get_repo,
-    comment_event,
-):
-    from src.usecases.handle_comment import handle_comment
 
+async def test_handle_comment_with_pattern_correction(mocks, comment_event):
     # Thread context
-    mock_gh.get_review_comments = AsyncMock(
-        return_value=[
-            {"id": 99, "body": "Use camelCase", "user": {"login": "louro[bot]"}},
-            {"id": 100, "body": "We use snake_case", "in_reply_to_id": 99, "user": {"login": "dev"}},
-        ]
-    )
-    mock_gh.reply_comment = AsyncMock()
-
-    mock_run_agent.return_value = _make_response("Thanks for the clarification!")
-    mock_classify.return_value = CommentClassification(sentiment="negative", is_pattern_correction=True)
+    mocks.gh.get_review_comments.return_value = [
+        {"id": 99, "body": "Use camelCase", "user": {"login": "louro[bot]"}},
+        {"id": 100, "body": "We use snake_case", "in_reply_to_id": 99, "user": {"login": "dev"}},
+    ]
+    mocks.run_agent_with_retry.return_value = _CORRECTION_REPLY
+    mocks.classify_comment.return_value = CommentClassification(sentiment="negative", is_pattern_correction=True)
 
     await handle_comment(comment_event)
 
-    mock_gh.reply_comment.assert_awaited_once()
-    mock_save_feedback.assert_awaited_once()
-    mock_store_feedback.assert_awaited_once()
     # Pattern correction should trigger evolution storage
-    mock_store_evolution.assert_awaited_once()
-
-
-@patch("src.usecases.handle_comment.get_repository", new_callable=AsyncMock, return_value=_make_repo_record())
-@patch("src.usecases.handle_comment.gh")
-@patch("src.usecases.handle_comment.create_comment_agent")
-@patch("src.usecases.handle_comment.run_agent_with_retry")
-@patch("src.usecases.handle_comment.classify_comment")
-@patch("src.usecases.handle_comment.save_feedback", new_callable=AsyncMock)
-@patch("src.usecases.handle_comment.store_feedback", new_callable=AsyncMock)
-@patch("src.usecases.handle_comment.store_evolution", new_callable=AsyncMock)
-@patch("src.usecases.handle_comment.get_org_language", new_callable=AsyncMock, return_value="pt-BR")
-async def test_handle_comment_positive_no_evolution(
-    mock_get_lang,
-    mock_store_evolution,
-    mock_store_feedback,
-    mock_save_feedback,
-    mock_classify,
-    mock_run_agent,
-    mock_create_agent,
-    mock_gh,
-    mock_get_repo,
-    comment_event,
-):
-    from src.usecases.handle_comment import handle_comment
-
-    mock_gh.get_review_comments = AsyncMock(return_value=[])
-    mock_gh.reply_comment = AsyncMock()
-
-    mock_run_agent.return_value = _make_response("Glad you agree!")
-    mock_classify.return_value = CommentClassification(sentiment="positive", is_pattern_correction=False)
+    _expect_awaits(mocks, {"gh.reply_comment": 1, "save_feedback": 1, "store_feedback": 1, "store_evolution": 1})
+
+
+async def test_handle_comment_positive_no_evolution(mocks, comment_event):
+    mocks.get_org_language.return_value = "pt-BR"
+    mocks.run_agent_with_retry.return_value = _POSITIVE_REPLY
+    mocks.classify_comment.return_value = CommentClassification(sentiment="positive", is_pattern_correction=False)
 
     await handle_comment(comment_event)
 
-    mock_gh.reply_comment.assert_awaited_once()
-    mock_save_feedback.assert_awaited_once()
     # Positive comment without correction should NOT store evolution
-    mock_store_evolution.assert_not_awaited()
-
-
-@patch("src.usecases.handle_comment.get_repository", new_callable=AsyncMock, return_value=_make_repo_record())
-@patch("src.usecases.handle_comment.gh")
-@patch("src.usecases.handle_comment.create_comment_agent")
-@patch("src.usecases.handle_comment.run_agent_with_retry")
-@patch("src.usecases.handle_comment.classify_comment")
-@patch("src.usecases.handle_comment.save_feedback", new_callable=AsyncMock)
-@patch("src.usecases.handle_comment.store_feedback", new_callable=AsyncMock)
-@patch("src.usecases.handle_comment.get_org_language", new_callable=AsyncMock, return_value="en-US")
-async def test_handle_comment_classification_failure_does_not_crash(
-    mock_get_lang,
-    mock_store_feedback,
-    mock_save_feedback,
-    mock_classify,
-    mock_run_agent,
-    mock_create_agent,
-    mock_gh,
-    mock_get_repo,
-    comment_event,
-):
-    from src.usecases.handle_comment import handle_comment
-
-    mock_gh.get_review_comments = AsyncMock(return_value=[])
-    mock_gh.reply_comment = AsyncMock()
-    mock_run_agent.return_value = _make_response("Reply text")
+    _expect_awaits(mocks, {"gh.reply_comment": 1, "save_feedback": 1, "store_evolution": 0})
+
+
+async def test_handle_comment_classification_failure_does_not_crash(mocks, comment_event):
+    mocks.run_agent_with_retry.return_value = _PLAIN_REPLY
 
     # Classification fails
-    mock_classify.side_effect = RuntimeError("model down")
+    mocks.classify_comment.side_effect = RuntimeError("model down")
 
     # Should not raise — classification failure is non-fatal
     await handle_comment(comment_event)
 
-    mock_gh.reply_comment.assert_awaited_once()
+    mocks.gh.reply_comment.assert_awaited_once()
+
+
+async def test_handle_comment_fetches_thread_alongside_language_lookup(mocks, comment_event):
+    thread_requested = asyncio.Event()
+
+    async def language_after_thread(org):
+        await thread_requested.wait()
+        return "en-US"
+
+    async def thread(*args):
+        thread_requested.set()
+        return []
+
+    mocks.get_org_language.side_effect = language_after_thread
+    mocks.gh.get_review_comments.side_effect = thread
+
+    # Awaiting the two one after the other would never finish
+    await asyncio.wait_for(handle_comment(comment_event), timeout=1)
+
+    mocks.gh.reply_comment.assert_awaited_once()
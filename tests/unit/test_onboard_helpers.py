@@ -2,49 +2,44 @@
 
 from __future__ import annotations
 
-import pytest
-
 from src.usecases.onboard_repo import _is_code_file
 
+_CODE_PATHS = (
+    "src/main.py",
+    "app/index.ts",
+    "components/Button.tsx",
+    "lib/utils.js",
+    "components/Form.jsx",
+    "cmd/server.go",
+    "src/lib.rs",
+    "com/example/App.java",
+    "src/Main.kt",
+    "app/models.rb",
+    "Services/Auth.cs",
+    "Sources/App.swift",
+    "lib/worker.ex",
+    "test/helper.exs",
+)
+
+_NON_CODE_PATHS = (
+    "README.md",
+    "config.yml",
+    "Makefile",
+    "LICENSE",
+    "Dockerfile",
+    ".gitignore",
+    "data.json",
+    "image.png",
+)
+
 
 class TestIsCodeFile:
-    @pytest.mark.parametrize(
-        "path",
-        [
-            "src/main.py",
-            "app/index.ts",
-            "components/Button.tsx",
-            "lib/utils.js",
-            "components/Form.jsx",
-            "cmd/server.go",
-            "src/lib.rs",
-            "com/example/App.java",
-            "src/Main.kt",
-            "app/models.rb",
-            "Services/Auth.cs",
-            "Sources/App.swift",
-            "lib/worker.ex",
-            "test/helper.exs",
-        ],
-    )
-    def test_code_files_return_true(self, path: str):
-        assert _is_code_file(path) is True
-
-    @pytest.mark.parametrize(
-        "path",
-        [
-            "README.md",
-            "config.yml",
-            "Makefile",
-            "LICENSE",
-            "Dockerfile",
-            ".gitignore",
-            "data.json",
-            "image.png",
-        ],
-    )
-    def test_non_code_files_return_false(self, path: str):
-        assert _is_code_file(path) is False
+    # One item per list; a failure still names every misclassified path
+    def test_code_files_return_true(self):
+        assert [p for p in _CODE_PATHS if _is_code_file(p) is not True] == []
+
+    def test_non_code_files_return_false(self):
+        assert [p for p in _NON_CODE_PATHS if _is_code_file(p) is not False] == []
 
     def test_no_extension(self):
         assert _is_code_file("Makefile") is False
@@ -3,11 +3,19 @@
 from __future__ import annotations
 
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from src.models import Repository, RepoStatus
+from src.usecases.onboard_repo import reset_discovery_cache
+
+
+@pytest.fixture(autouse=True)
+def _clean_discovery_cache():
+    reset_discovery_cache()
+    yield
+    reset_discovery_cache()
 
 
 @pytest.fixture
@@ -22,86 +30,110 @@ def _make_response(content: str):
     )
 
 
-@patch("src.usecases.onboard_repo.set_repository_status", new_callable=AsyncMock)
-@patch("src.usecases.onboard_repo.upsert_repository", new_callable=AsyncMock)
-@patch("src.usecases.onboard_repo.gh")
-@patch("src.usecases.onboard_repo.create_onboard_agent")
-@patch("src.usecases.onboard_repo.create_evolution_agent")
-@patch("src.usecases.onboard_repo.run_agent_with_retry")
-@patch("src.usecases.onboard_repo.store_onboarding", new_callable=AsyncMock)
-@patch("src.usecases.onboard_repo.store_evolution", new_callable=AsyncMock)
-async def test_onboard_repo_happy_path(
-    mock_store_evolution,
-    mock_store_onboarding,
-    mock_run_agent,
-    mock_create_evolution,
-    mock_create_onboard,
-    mock_gh,
-    mock_upsert,
-    mock_set_status,
-    repo,
-):
+@pytest.fixture
+def mocks():
+    """Patch every collaborator of onboard_repo at once; tests tweak the returned mocks."""
+    ns = SimpleNamespace(
+        set_repository_status=AsyncMock(),
+        upsert_repository=AsyncMock(),
+        gh=MagicMock(
+            get_repo_tree=AsyncMock(return_value=["README.md"]),
+            get_file_content=AsyncMock(return_value="content"),
+            get_recent_commits=AsyncMock(return_value=[]),
+            get_commit_files=AsyncMock(return_value=[]),
+            get_recent_prs=AsyncMock(return_value=[]),
+        ),
+        create_onboard_agent=MagicMock(),
+        create_evolution_agent=MagicMock(),
+        run_agent_with_retry=AsyncMock(),
+        store_onboarding=AsyncMock(),
+        store_evolution=AsyncMock(),
+    )
+    with patch.multiple("src.usecases.onboard_repo", **vars(ns)):
+        yield ns
+
+
+async def test_onboard_repo_happy_path(mocks, repo):
     from src.usecases.onboard_repo import onboard_repo
 
-    mock_gh.get_repo_tree = AsyncMock(return_value=["src/main.py", "pyproject.toml", "README.md"])
-    mock_gh.get_file_content = AsyncMock(return_value="file content here")
-    mock_gh.get_recent_commits = AsyncMock(
-        return_value=[{"sha": "aaa"}, {"sha": "bbb"}],
-    )
-    mock_gh.get_commit_files = AsyncMock(return_value=["src/main.py"])
-    mock_gh.get_recent_prs = AsyncMock(return_value=[{"number": 1, "title": "First PR"}])
+    mocks.gh.get_repo_tree.return_value = ["src/main.py", "pyproject.toml", "README.md"]
+    mocks.gh.get_file_content.return_value = "file content here"
+    mocks.gh.get_recent_commits.return_value = [{"sha": "aaa"}, {"sha": "bbb"}]
+    mocks.gh.get_commit_files.return_value = ["src/main.py"]
+    mocks.gh.get_recent_prs.return_value = [{"number": 1, "title": "First PR"}]
 
-    mock_run_agent.return_value = _make_response("Analysis complete")
+    mocks.run_agent_with_retry.return_value = _make_response("Analysis complete")
 
     await onboard_repo(repo)
 
-    mock_upsert.assert_awaited_once()
-    mock_store_onboarding.assert_awaited_once()
-    mock_store_evolution.assert_awaited_once()
-    mock_set_status.assert_awaited_once_with("acme/app", RepoStatus.ACTIVE)
+    mocks.upsert_repository.assert_awaited_once()
+    mocks.store_onboarding.assert_awaited_once()
+    mocks.store_evolution.assert_awaited_once()
+    mocks.set_repository_status.assert_awaited_once_with("acme/app", RepoStatus.ACTIVE)
 
 
-@patch("src.usecases.onboard_repo.set_repository_status", new_callable=AsyncMock)
-@patch("src.usecases.onboard_repo.upsert_repository", new_callable=AsyncMock)
-@patch("src.usecases.onboard_repo.gh")
-async def test_onboard_repo_tree_failure_raises(mock_gh, mock_upsert, mock_set_status, repo):
+async def test_onboard_repo_tree_failure_raises(mocks, repo):
     from src.usecases.onboard_repo import onboard_repo
 
-    mock_gh.get_repo_tree = AsyncMock(side_effect=RuntimeError("API error"))
+    mocks.gh.get_repo_tree.side_effect = RuntimeError("API error")
 
     with pytest.raises(RuntimeError, match="API error"):
         await onboard_repo(repo)
 
-    mock_set_status.assert_awaited_once_with("acme/app", RepoStatus.PENDING)
+    mocks.set_repository_status.assert_awaited_once_with("acme/app", RepoStatus.PENDING)
 
 
-@patch("src.usecases.onboard_repo.set_repository_status", new_callable=AsyncMock)
-@patch("src.usecases.onboard_repo.upsert_repository", new_callable=AsyncMock)
-@patch("src.usecases.onboard_repo.gh")
-@patch("src.usecases.onboard_repo.create_onboard_agent")
-@patch("src.usecases.onboard_repo.run_agent_with_retry")
-@patch("src.usecases.onboard_repo.store_onboarding", new_callable=AsyncMock)
-async def test_onboard_repo_no_recent_files_skips_evolution(
-    mock_store_onboarding,
-    mock_run_agent,
-    mock_create_onboard,
-    mock_gh,
-    mock_upsert,
-    mock_set_status,
-    repo,
-):
+async def test_onboard_repo_retry_reuses_discovery(mocks, repo):
+    from src.usecases.onboard_repo import MAX_FILE_SIZE, _discovery_cache, onboard_repo
+
+    mocks.gh.get_recent_commits.return_value = [{"sha": "aaa"}]
+    mocks.run_agent_with_retry.side_effect = [RuntimeError("LLM error"), _make_response("Analysis")]
+
+    with pytest.raises(RuntimeError, match="LLM error"):
+        await onboard_repo(repo)
+    await onboard_repo(repo)
+
+    mocks.gh.get_repo_tree.assert_awaited_once_with(1, "acme/app", "aaa")
+    mocks.gh.get_file_content.assert_awaited_once_with(1, "acme/app", "README.md", "aaa", max_bytes=MAX_FILE_SIZE)
+    assert mocks.set_repository_status.await_args_list[-1].args == ("acme/app", RepoStatus.ACTIVE)
+    assert not _discovery_cache
+
+
+async def test_onboard_repo_retry_after_push_rediscovers(mocks, repo):
     from src.usecases.onboard_repo import onboard_repo
 
-    mock_gh.get_repo_tree = AsyncMock(return_value=["README.md"])
-    mock_gh.get_file_content = AsyncMock(return_value="content")
-    mock_gh.get_recent_commits = AsyncMock(return_value=[])
+    mocks.gh.get_recent_commits.side_effect = [[{"sha": "aaa"}], [{"sha": "bbb"}, {"sha": "aaa"}]]
+    mocks.run_agent_with_retry.side_effect = [RuntimeError("LLM error"), _make_response("Analysis")]
+
+    with pytest.raises(RuntimeError, match="LLM error"):
+        await onboard_repo(repo)
+    await onboard_repo(repo)
+
+    assert [c.args[2] for c in mocks.gh.get_repo_tree.await_args_list] == ["aaa", "bbb"]
+
 
-    mock_run_agent.return_value = _make_response("Analysis")
+async def test_onboard_repo_prunes_expired_discovery(mocks, repo):
+    from src.usecases.onboard_repo import _discovery_cache, onboard_repo
 
-    with patch("src.usecases.onboard_repo.store_evolution", new_callable=AsyncMock) as mock_store_evolution:
+    _discovery_cache[("acme/stale", "old")] = (0.0, [], "", "")
+    mocks.gh.get_recent_commits.return_value = [{"sha": "aaa"}]
+    mocks.run_agent_with_retry.side_effect = RuntimeError("LLM error")
+
+    with pytest.raises(RuntimeError, match="LLM error"):
         await onboard_repo(repo)
-        # No recent files = no evolution analysis
-        mock_store_evolution.assert_not_awaited()
+
+    assert list(_discovery_cache) == [("acme/app", "aaa")]
+
+
+async def test_onboard_repo_no_recent_files_skips_evolution(mocks, repo):
+    from src.usecases.onboard_repo import onboard_repo
+
+    mocks.run_agent_with_retry.return_value = _make_response("Analysis")
+
+    await onboard_repo(repo)
+
+    # No recent files = no evolution analysis
+    mocks.store_evolution.assert_not_awaited()
 
 
 def test_is_code_file():
@@ -113,3 +145,28 @@ def test_is_code_file():
     assert _is_code_file("README.md") is False
     assert _is_code_file("Makefile") is False
     assert _is_code_file("data.json") is False
+
+
+@patch("src.usecases.onboard_repo.gh")
+async def test_fetch_structural_samples_caps_at_max_sample_files(mock_gh, repo):
+    from src.usecases.onboard_repo import MAX_SAMPLE_FILES, _fetch_structural_samples
+
+    tree = [f"src/services/svc_{i}.py" for i in range(100)]
+    mock_gh.get_file_content = AsyncMock(return_value="content")
+
+    await _fetch_structural_samples(repo, tree, "main")
+
+    assert mock_gh.get_file_content.await_count == MAX_SAMPLE_FILES
+
+
+@patch("src.usecases.onboard_repo.gh")
+async def test_fetch_key_files_matches_nested_and_root_paths(mock_gh, repo):
+    from src.usecases.onboard_repo import _fetch_key_files
+
+    mock_gh.get_file_content = AsyncMock(return_value="content")
+
+    result = await _fetch_key_files(repo, ["pyproject.toml", "src/app.py", "web/package.json"], "main")
+
+    assert "### pyproject.toml" in result
+    assert "### web/package.json" in result
+    assert "src/app.py" not in result
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
-from src.models import FileDiff, PullRequest, Repository, ReviewCommentSchema, ReviewResponseSchema
+from dataclasses import replace
+
+from src.models import FileDiff, PullRequest, ReviewResponseSchema
 from src.usecases.review_pr import _extract_review, _format_diff
 
+# Raw agent outputs for the string fallback path
+_FULL_JSON = '{"summary": "All good", "comments": [{"path": "a.py", "line": 1, "body": "fix"}]}'
+_NO_SUMMARY_JSON = '{"comments": [{"path": "x.py", "line": 5, "body": "nit"}]}'
+_NO_COMMENTS_JSON = '{"summary": "No issues found"}'
+
 
 class TestFormatDiff:
     def test_single_file(self, sample_pr: PullRequest):
-        sample_pr.files = [sample_pr.files[0]]
-        result = _format_diff(sample_pr)
+        result = _format_diff(replace(sample_pr, files=sample_pr.files[:1]))
         assert "### src/auth.py (added, +10/-0)" in result
         assert "```diff" in result
         assert "def login():" in result
@@ -19,28 +25,15 @@ class TestFormatDiff:
         assert "### src/auth.py" in result
         assert "### src/routes.py" in result
 
-    def test_empty_patch_is_skipped(self, sample_repo: Repository):
-        pr = PullRequest(
-            number=1,
-            title="t",
-            body="b",
-            head_sha="sha",
-            base_branch="main",
-            head_branch="feat",
-            repo=sample_repo,
-            files=[FileDiff(filename="empty.py", status="modified", patch="")],
-        )
+    def test_empty_patch_is_skipped(self, sample_pr: PullRequest):
+        pr = replace(sample_pr, files=[FileDiff(filename="empty.py", status="modified", patch="")])
         result = _format_diff(pr)
         assert result == ""
 
 
 class TestExtractReview:
-    def test_structured_output(self):
-        schema = ReviewResponseSchema(
-            summary="All good",
-            comments=[ReviewCommentSchema(path="a.py", line=1, body="fix")],
-        )
-        review = _extract_review(schema)
+    def test_structured_output(self, review_response_schema: ReviewResponseSchema):
+        review = _extract_review(review_response_schema)
         assert review.body == "All good"
         assert len(review.comments) == 1
         assert review.comments[0].path == "a.py"
@@ -54,8 +47,7 @@ class TestExtractReview:
         assert review.comments == []
 
     def test_json_string_fallback(self):
-        content = '{"summary": "All good", "comments": [{"path": "a.py", "line": 1, "body": "fix"}]}'
-        review = _extract_review(content)
+        review = _extract_review(_FULL_JSON)
         assert review.body == "All good"
         assert len(review.comments) == 1
         assert review.comments[0].path == "a.py"
@@ -67,13 +59,11 @@ class TestExtractReview:
         assert review.comments == []
 
     def test_missing_summary_key(self):
-        content = '{"comments": [{"path": "x.py", "line": 5, "body": "nit"}]}'
-        review = _extract_review(content)
+        review = _extract_review(_NO_SUMMARY_JSON)
         assert review.body == "Code review complete."
         assert len(review.comments) == 1
 
     def test_missing_comments_key(self):
-        content = '{"summary": "No issues found"}'
-        review = _extract_review(content)
+        review = _extract_review(_NO_COMMENTS_JSON)
         assert review.body == "No issues found"
         assert review.comments == []
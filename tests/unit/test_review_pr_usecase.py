@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from types import SimpleNamespace
-from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from src.models import FileDiff, PullRequest, Repository, RepoStatus, ReviewCommentSchema, ReviewResponseSchema
+from src.models import FileDiff, PullRequest, Repository, RepoStatus
+from src.usecases.review_pr import (
+    _MAX_DIFF_CHARS,
+    _SUMMARY_END,
+    _SUMMARY_START,
+    _build_pr_body,
+    _format_diff,
+    _should_skip_file,
+    review_pr,
+)
 
 
 @pytest.fixture
@@ -39,101 +48,86 @@ def _make_agent_response(content):
     )
 
 
-_REVIEW_RESPONSE = ReviewResponseSchema(
-    summary="Looks good",
-    comments=[ReviewCommentSchema(path="src/foo.py", line=1, body="ok")],
-)
+@dataclass(frozen=True, slots=True)
+class _RepoRecord:
+    """The slice of RepositoryRecord that review_pr reads."""
 
+    status: RepoStatus
 
-@patch("src.usecases.review_pr.get_repository")
-@patch("src.usecases.review_pr.get_org_language", new_callable=AsyncMock, return_value="en-US")
-@patch("src.usecases.review_pr.gh")
-@patch("src.usecases.review_pr.create_review_agent")
-@patch("src.usecases.review_pr.run_agent_with_retry")
-@patch("src.usecases.review_pr.save_review", new_callable=AsyncMock)
-@patch("src.usecases.review_pr.record_usage_event", new_callable=AsyncMock)
-@patch("src.usecases.review_pr.db_session")
-async def test_review_pr_happy_path(
-    mock_db_session,
-    mock_record_usage,
-    mock_save_review,
-    mock_run_agent,
-    mock_create_agent,
-    mock_gh,
-    mock_get_lang,
-    mock_get_repo,
-    pr,
-):
-    from src.usecases.review_pr import review_pr
-
-    # Setup mocks
-    record = MagicMock()
-    record.status = RepoStatus.ACTIVE
-    mock_get_repo.return_value = record
-
-    mock_gh.get_diff_files = AsyncMock(return_value=pr.files)
-    mock_gh.update_pr_description = AsyncMock()
-    mock_gh.post_review = AsyncMock()
-
-    mock_run_agent.return_value = _make_agent_response(_REVIEW_RESPONSE)
-
-    # Mock the db_session context manager
-    mock_session = AsyncMock()
-    mock_cm = AsyncMock()
-    mock_cm.__aenter__ = AsyncMock(return_value=mock_session)
-    mock_cm.__aexit__ = AsyncMock(return_value=False)
-    mock_db_session.return_value = mock_cm
 
-    await review_pr(pr)
+class _AsyncStub:
+    """Async callable that records its calls and returns *ret*; a cheap stand-in for AsyncMock."""
+
+    def __init__(self, ret=None):
+        self.ret = ret
+        self.calls: list[tuple[tuple, dict]] = []
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self.ret
+
+
+async def test_review_pr_happy_path(monkeypatch, pr, review_response_schema):
+    gh = SimpleNamespace(
+        get_diff_files=_AsyncStub(pr.files),
+        update_pr_description=_AsyncStub(),
+        post_review=_AsyncStub(),
+    )
+    save_review = _AsyncStub()
+    for name, value in {
+        "get_repository": _AsyncStub(_RepoRecord(status=RepoStatus.ACTIVE)),
+        "get_org_language": _AsyncStub("en-US"),
+        "gh": gh,
+        "create_review_agent": lambda *args, **kwargs: None,
+        "run_agent_with_retry": _AsyncStub(_make_agent_response(review_response_schema)),
+        "save_review_with_usage": save_review,
+    }.items():
+        monkeypatch.setattr(f"src.usecases.review_pr.{name}", value)
 
-    mock_gh.get_diff_files.assert_awaited_once()
-    mock_gh.post_review.assert_awaited_once()
-    mock_gh.update_pr_description.assert_awaited_once()
-    mock_save_review.assert_awaited_once()
-    mock_record_usage.assert_awaited_once()
+    await review_pr(pr)
 
+    assert len(gh.get_diff_files.calls) == 1
+    assert len(gh.post_review.calls) == 1
+    assert len(gh.update_pr_description.calls) == 1
+    assert save_review.calls == [(("acme", "acme/app", 10, "All good", 1, "dev-user"), {})]
 
-@patch("src.usecases.review_pr.get_repository")
-async def test_review_pr_skips_inactive_repo(mock_get_repo, pr):
-    from src.usecases.review_pr import review_pr
 
-    record = MagicMock()
-    record.status = RepoStatus.PENDING
-    mock_get_repo.return_value = record
+async def test_review_pr_skips_inactive_repo(monkeypatch, pr):
+    get_diff_files = _AsyncStub([])
+    monkeypatch.setattr("src.usecases.review_pr.get_repository", _AsyncStub(_RepoRecord(status=RepoStatus.PENDING)))
+    monkeypatch.setattr("src.usecases.review_pr.gh", SimpleNamespace(get_diff_files=get_diff_files))
 
     # Should return early without error
     await review_pr(pr)
 
+    assert get_diff_files.calls == []
 
-@patch("src.usecases.review_pr.get_repository")
-async def test_review_pr_skips_missing_repo(mock_get_repo, pr):
-    from src.usecases.review_pr import review_pr
 
-    mock_get_repo.return_value = None
+async def test_review_pr_skips_missing_repo(monkeypatch, pr):
+    get_diff_files = _AsyncStub([])
+    monkeypatch.setattr("src.usecases.review_pr.get_repository", _AsyncStub(None))
+    monkeypatch.setattr("src.usecases.review_pr.gh", SimpleNamespace(get_diff_files=get_diff_files))
 
     await review_pr(pr)
 
+    assert get_diff_files.calls == []
 
-@patch("src.usecases.review_pr.get_repository")
-@patch("src.usecases.review_pr.gh")
-async def test_review_pr_skips_empty_diff(mock_gh, mock_get_repo, pr):
-    from src.usecases.review_pr import review_pr
 
-    record = MagicMock()
-    record.status = RepoStatus.ACTIVE
-    mock_get_repo.return_value = record
-    mock_gh.get_diff_files = AsyncMock(return_value=[])
+async def test_review_pr_skips_empty_diff(monkeypatch, pr):
+    post_review = _AsyncStub()
+    monkeypatch.setattr("src.usecases.review_pr.get_repository", _AsyncStub(_RepoRecord(status=RepoStatus.ACTIVE)))
+    monkeypatch.setattr("src.usecases.review_pr.get_org_language", _AsyncStub())
+    monkeypatch.setattr(
+        "src.usecases.review_pr.gh", SimpleNamespace(get_diff_files=_AsyncStub([]), post_review=post_review)
+    )
 
     await review_pr(pr)
 
     # Should not attempt to run agent or post review
-    mock_gh.post_review = AsyncMock()
-    mock_gh.post_review.assert_not_awaited()
+    assert post_review.calls == []
 
 
 def test_format_diff_skips_lock_files():
-    from src.usecases.review_pr import _should_skip_file
-
     assert _should_skip_file("package-lock.json") is True
     assert _should_skip_file("yarn.lock") is True
     assert _should_skip_file("uv.lock") is True
@@ -143,17 +137,11 @@ def test_format_diff_skips_lock_files():
 
 
 def test_format_diff_truncates_large_diffs():
-    from src.usecases.review_pr import _format_diff
-
+    # Two of these overflow the budget, so three files exercise the cut-off
+    patch = "+" * (_MAX_DIFF_CHARS // 2)
     files = [
-        FileDiff(
-            filename=f"src/file_{i}.py",
-            status="modified",
-            patch="+" * 10_000,
-            additions=100,
-            deletions=0,
-        )
-        for i in range(20)
+        FileDiff(filename=f"src/file_{i}.py", status="modified", patch=patch, additions=100, deletions=0)
+        for i in range(3)
     ]
     pr = PullRequest(
         number=1,
@@ -166,20 +154,17 @@ def test_format_diff_truncates_large_diffs():
         files=files,
     )
     result = _format_diff(pr)
-    assert "omitted" in result
+    assert result.count(patch) == 1
+    assert "2 more file(s) omitted" in result
 
 
 def test_build_pr_body_appends():
-    from src.usecases.review_pr import _build_pr_body
-
     result = _build_pr_body("Original text", "AI summary")
     assert "Original text" in result
     assert "AI summary" in result
 
 
 def test_build_pr_body_replaces_existing():
-    from src.usecases.review_pr import _SUMMARY_END, _SUMMARY_START, _build_pr_body
-
     original = f"Text\n{_SUMMARY_START}\nold summary\n{_SUMMARY_END}\nAfter"
     result = _build_pr_body(original, "new summary")
     assert "old summary" not in result
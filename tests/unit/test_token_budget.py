@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
-import asyncio
+import time
 from unittest.mock import patch
 
+import pytest
+
 from src.agent.retry import TokenBudget
 
 
+@pytest.fixture(scope="module")
+def old_ts() -> float:
+    # Already outside the 60s window, and only gets older as the module runs
+    return time.monotonic() - 61
+
+
 class TestTokenBudget:
     def test_initial_state(self):
         budget = TokenBudget(tokens_per_minute=10_000)
@@ -30,8 +38,6 @@ class TestTokenBudget:
     def test_record_actual_adjusts_up(self):
         budget = TokenBudget(tokens_per_minute=10_000)
         # Simulate a reservation
-        import time
-
         budget._log.append((time.monotonic(), 1_000))
         budget.record_actual(estimated=1_000, actual=1_500)
         # Should have original 1000 + adjustment of +500
@@ -39,8 +45,6 @@ class TestTokenBudget:
 
     def test_record_actual_adjusts_down(self):
         budget = TokenBudget(tokens_per_minute=10_000)
-        import time
-
         budget._log.append((time.monotonic(), 1_000))
         budget.record_actual(estimated=1_000, actual=600)
         # 1000 + (600 - 1000) = 600
@@ -48,56 +52,32 @@ class TestTokenBudget:
 
     def test_record_actual_no_adjustment_when_equal(self):
         budget = TokenBudget(tokens_per_minute=10_000)
-        import time
-
         budget._log.append((time.monotonic(), 1_000))
         initial_len = len(budget._log)
         budget.record_actual(estimated=1_000, actual=1_000)
         assert len(budget._log) == initial_len  # no new entry
 
-    async def test_purge_removes_old_entries(self):
+    async def test_purge_removes_old_entries(self, old_ts):
         budget = TokenBudget(tokens_per_minute=10_000)
         # Add an entry 61 seconds in the past
-        import time
-
-        old_ts = time.monotonic() - 61
         budget._log.append((old_ts, 5_000))
         # After purge (triggered by tokens_used), old entry should be gone
         assert budget.tokens_used == 0
         assert budget.tokens_available == 10_000
 
-    async def test_concurrent_acquires_one_waits(self):
+    async def test_acquires_fit_once_old_entries_expire(self, old_ts):
         budget = TokenBudget(tokens_per_minute=10_000)
 
-        # Mock time.monotonic to control the sliding window
-        base_time = 1000.0
-        current_time = base_time
-
-        def mock_monotonic():
-            return current_time
-
-        with patch("src.agent.retry.time.monotonic", side_effect=mock_monotonic):
+        # Pin time.monotonic to control the sliding window
+        with patch("src.agent.retry.time.monotonic", return_value=1000.0):
             # First acquire takes most of the budget
             await budget.acquire(8_000)
 
-        # Now with real time, try two concurrent acquires that together exceed budget
-        # The second one should need to wait
-        results = []
-
-        async def acquire_and_record(n: int, tokens: int):
-            await budget.acquire(tokens)
-            results.append(n)
-
         # Advance time so the first entry expires
-        import time
-
-        old_ts = time.monotonic() - 61
         budget._log.clear()
         budget._log.append((old_ts, 8_000))
 
-        # Both should fit after purge
-        await asyncio.gather(
-            acquire_and_record(1, 3_000),
-            acquire_and_record(2, 3_000),
-        )
-        assert len(results) == 2
+        # Together these exceed what was left, but both fit after the purge
+        await budget.acquire(3_000)
+        await budget.acquire(3_000)
+        assert budget.tokens_used == 6_000
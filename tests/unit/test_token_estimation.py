@@ -2,22 +2,22 @@
 
 from __future__ import annotations
 
-from src.agent.retry import _CHARS_PER_TOKEN, _OVERHEAD_TOKENS, _estimate_tokens
-
+import pytest
 
-class TestEstimateTokens:
-    def test_empty_prompt(self):
-        assert _estimate_tokens("") == _OVERHEAD_TOKENS
+from src.agent.retry import _CHARS_PER_TOKEN, _OVERHEAD_TOKENS, _estimate_tokens
 
-    def test_formula(self):
-        prompt = "a" * 400  # 400 chars / 4 = 100 tokens
-        assert _estimate_tokens(prompt) == _OVERHEAD_TOKENS + 100
+_FORMULA_PROMPT = "a" * 400  # 400 chars / 4 = 100 tokens
+_LONG_PROMPT = "x" * 10_000
 
-    def test_short_prompt(self):
-        prompt = "hello"
-        expected = _OVERHEAD_TOKENS + len(prompt) // _CHARS_PER_TOKEN
-        assert _estimate_tokens(prompt) == expected
 
-    def test_long_prompt(self):
-        prompt = "x" * 10_000
-        assert _estimate_tokens(prompt) == _OVERHEAD_TOKENS + 2_500
+@pytest.mark.parametrize(
+    ("prompt", "expected"),
+    [
+        pytest.param("", _OVERHEAD_TOKENS, id="empty"),
+        pytest.param(_FORMULA_PROMPT, _OVERHEAD_TOKENS + 100, id="formula"),
+        pytest.param("hello", _OVERHEAD_TOKENS + len("hello") // _CHARS_PER_TOKEN, id="short"),
+        pytest.param(_LONG_PROMPT, _OVERHEAD_TOKENS + 2_500, id="long"),
+    ],
+)
+def test_estimate_tokens(prompt: str, expected: int):
+    assert _estimate_tokens(prompt) == expected
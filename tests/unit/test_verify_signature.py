@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import hashlib
 import hmac
+from functools import cache
 from unittest.mock import patch
 
 import pytest
@@ -11,7 +12,12 @@ from fastapi import HTTPException
 
 from src.github.webhooks import _verify_signature
 
+_SECRET = "test-secret-123"
+_PAYLOAD = b'{"action": "opened"}'
+_BAD_SIG = "sha256=" + "0" * 64
 
+
+@cache
 def _make_signature(payload: bytes, secret: str) -> str:
     return "sha256=" + hmac.new(secret.encode(), payload, hashlib.sha256).hexdigest()
 
@@ -19,28 +25,21 @@ def _make_signature(payload: bytes, secret: str) -> str:
 class TestVerifySignature:
     @patch("src.github.webhooks.get_settings")
     def test_valid_signature(self, mock_settings):
-        secret = "test-secret-123"
-        mock_settings.return_value.github_webhook_secret = secret
-        payload = b'{"action": "opened"}'
-        signature = _make_signature(payload, secret)
+        mock_settings.return_value.github_webhook_secret = _SECRET
         # Should not raise
-        _verify_signature(payload, signature)
+        _verify_signature(_PAYLOAD, _make_signature(_PAYLOAD, _SECRET))
 
     @patch("src.github.webhooks.get_settings")
     def test_invalid_signature_raises_401(self, mock_settings):
-        secret = "test-secret-123"
-        mock_settings.return_value.github_webhook_secret = secret
-        payload = b'{"action": "opened"}'
-        bad_signature = "sha256=0000000000000000000000000000000000000000000000000000000000000000"
+        mock_settings.return_value.github_webhook_secret = _SECRET
         with pytest.raises(HTTPException) as exc_info:
-            _verify_signature(payload, bad_signature)
+            _verify_signature(_PAYLOAD, _BAD_SIG)
         assert exc_info.value.status_code == 401
 
     @patch("src.github.webhooks.get_settings")
     def test_wrong_secret_raises_401(self, mock_settings):
         mock_settings.return_value.github_webhook_secret = "correct-secret"
-        payload = b'{"test": true}'
-        signature = _make_signature(payload, "wrong-secret")
+        signature = _make_signature(_PAYLOAD, "wrong-secret")
         with pytest.raises(HTTPException) as exc_info:
-            _verify_signature(payload, signature)
+            _verify_signature(_PAYLOAD, signature)
         assert exc_info.value.status_code == 401